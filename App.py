@@ -1,26 +1,10 @@
 import streamlit as st
 
-# ==== Bank Modules ====
-import Rak_Bank
-import al_jazira_bank
-import emirates_islamic_bank
-import fab_bank
-import Wio_bank
-import adib_bank
-import mashreq
-import adcb
+# ==== Bank Modules (imported lazily on selection) ====
+import importlib
+from bank_registry import bank_modules, resolve
 
-# ==== Bank Mapping ====
-bank_modules = {
-    "🏦 RAK Bank": Rak_Bank,
-    #"🏛️ Al Jazira Bank - Coming soon": al_jazira_bank,
-    "🏢 Emirates Islamic Bank": emirates_islamic_bank,
-    "🏬 FAB Bank": fab_bank,
-    "🏛️ WIO Bank": Wio_bank,
-    "🏤 ADIB Bank": adib_bank,
-    "🏤 Mashreq Neo Bank": mashreq,
-    "🏤 ADCB Bank": adcb
-}
+auto_detect_label = "🔎 Auto-detect (mixed upload)"
 
 # ==== Page Config ====
 st.set_page_config(page_title="Bank PDF Extractor", layout="centered")
@@ -75,12 +59,14 @@ st.markdown("<div class='subtext'>Convert your bank PDFs into clean, usable data
 # ==== Glass Dropdown Section ====
 st.markdown('<div class="glass-card">', unsafe_allow_html=True)
 st.markdown('<div class="dropdown-label"> Select Your Bank</div>', unsafe_allow_html=True)
-selected_bank = st.selectbox("", list(bank_modules.keys()))
+selected_bank = st.selectbox("", list(bank_modules.keys()) + [auto_detect_label])
 st.markdown('</div>', unsafe_allow_html=True)
 
 # ==== Divider ====
 st.markdown("<hr>", unsafe_allow_html=True)
 
 # ==== Launch Selected Bank Processor ====
-if selected_bank:
-    bank_modules[selected_bank].run()
+if selected_bank == auto_detect_label:
+    importlib.import_module("bank_detect").run()
+elif selected_bank:
+    resolve(selected_bank).run()
@@ -1,114 +1,152 @@
 # Rak_Bank.py – Example Streamlit-compatible Bank Parser Module
 
-import fitz  # PyMuPDF
 import re
 import pandas as pd
 import os
 import streamlit as st
 from io import BytesIO
 
+import export
+import incremental
+import page_text
+import page_triage
+import reconcile
+import store
+import streaming
+import timing
+from line_classifier import LineClassifier, NOISE, START
+from transaction_buffer import PendingTransaction
+
+text_backend = os.environ.get("RAK_TEXT_BACKEND", "pymupdf")  # see page_text.py
+
+PARSER_VERSION = f"4-{text_backend}"  # see parse_cache.py
+
 # Regular expression to identify date format
 date_pattern = re.compile(r'^\d{2}-[A-Za-z]{3}-\d{4}')
+amount_pattern = re.compile(r'\d[\d,]*\.\d{2}')
 
-def process_pdf(pdf_file, filename="uploaded_file.pdf"):
-    transactions = []
-    current_trans = None
+noise_keywords = [
+    "page", "date issued", "your current account transactions",
+    "account type: current account", "الإصدار", "مدة الكشف"
+]
+
+# Keywords match case-insensitively, so lines are no longer lower-cased first
+line_classifier = LineClassifier(noise=noise_keywords, start=date_pattern, ignore_case=True)
+
+# Pages without a dated line (cover, T&Cs) are skipped whole (see page_triage.py),
+# unless the transaction open at the end of the previous page still lacks its
+# amount and balance: then the page continues it
+page_probe = page_triage.PageProbe(date_pattern)
 
-    doc = fitz.open(stream=pdf_file.read(), filetype="pdf")
+columns = ["PDF_File", "Date", "Description", "Cheque", "Withdrawal", "Deposit", "Balance"]
 
-    for page in doc:
-        lines = page.get_text("text").splitlines()
+# Column map read by store.py, reconcile.py and schema.py
+fields = {"date": ("Date", "%d-%b-%Y"), "debit": "Withdrawal", "credit": "Deposit", "balance": "Balance",
+          "description": "Description", "source": "PDF_File"}
+
+def finish_transaction(trans, filename):
+    desc = " ".join(trans.lines)
+    desc = desc.replace(" Cr.", "").replace(" Dr.", "")
+    amounts = amount_pattern.findall(desc)
+    withdrawal = deposit = balance = None
+
+    if len(amounts) >= 2:
+        amount_str = amounts[-2]
+        balance_str = amounts[-1]
+
+        balance = float(balance_str.replace(",", ""))
+        amount_value = float(amount_str.replace(",", ""))
+
+        desc_lower = desc.lower()
+        if any(word in desc_lower for word in ["transfer from", "deposit", "credit", "funds transfer"]):
+            deposit = amount_value
+        else:
+            withdrawal = amount_value
+
+        desc = desc[:desc.rfind(amount_str)].strip()
+
+    return filename, trans.date, desc, None, withdrawal, deposit, balance
+
+# Stream transactions page by page; a transaction may continue onto the next page
+def iter_pages(pdf_file, filename="uploaded_file.pdf", backend=None):
+    current_trans = None
+
+    for page_no, page_count, lines in page_text.iter_lines(pdf_file, backend or text_backend):
+        transactions = []
+        continues = current_trans is not None and len(amount_pattern.findall(" ".join(current_trans.lines))) < 2
+        if not page_triage.keep(lines, page_probe, continues):
+            lines = []
 
         # Identify start of transaction lines
         start_idx = 0
         for i, line in enumerate(lines):
-            if line.strip().startswith("Date") and "Balance" in line:
+            if line.startswith("Date") and "Balance" in line:
                 start_idx = i + 1
                 break
 
-        for line in lines[start_idx:]:
-            clean_line = line.strip()
-            clean_line_lower = clean_line.lower()
-
-            if not clean_line or any(keyword in clean_line_lower for keyword in [
-                "page", "date issued", "your current account transactions",
-                "account type: current account", "الإصدار", "مدة الكشف"
-            ]):
+        for clean_line in lines[start_idx:]:
+            kind, _ = line_classifier.classify(clean_line)
+            if kind == NOISE:
                 continue
 
-            if date_pattern.match(clean_line):
+            if kind == START:
                 if current_trans:
-                    transactions.append(current_trans)
+                    transactions.append(finish_transaction(current_trans, filename))
 
                 parts = clean_line.split(maxsplit=1)
                 date = parts[0]
                 description = parts[1] if len(parts) > 1 else ""
 
-                current_trans = {
-                    "PDF_File": filename,
-                    "Date": date,
-                    "Description": description,
-                    "Cheque": None,
-                    "Withdrawal": None,
-                    "Deposit": None,
-                    "Balance": None
-                }
+                current_trans = PendingTransaction(date, lines=[description])
             else:
                 if current_trans:
-                    current_trans["Description"] += " " + clean_line
+                    current_trans.add(clean_line)
 
-    if current_trans:
-        transactions.append(current_trans)
+        if page_no == page_count and current_trans:
+            transactions.append(finish_transaction(current_trans, filename))
 
-    for trans in transactions:
-        desc = trans["Description"]
-        desc = desc.replace(" Cr.", "").replace(" Dr.", "")
-        amounts = re.findall(r'\d[\d,]*\.\d{2}', desc)
+        yield page_no, page_count, transactions
 
-        if len(amounts) >= 2:
-            amount_str = amounts[-2]
-            balance_str = amounts[-1]
+def process_pdf(pdf_file, filename="uploaded_file.pdf", backend=None):
+    return streaming.collect(iter_pages(pdf_file, filename, backend), columns)
 
-            trans["Balance"] = float(balance_str.replace(",", ""))
-            amount_value = float(amount_str.replace(",", ""))
+# Headless entry points (used by run() and batch_convert)
+def to_frame(buffer, filename="uploaded_file.pdf"):
+    return buffer.to_frame()
 
-            desc_lower = desc.lower()
-            if any(word in desc_lower for word in ["transfer from", "deposit", "credit", "funds transfer"]):
-                trans["Deposit"] = amount_value
-                trans["Withdrawal"] = None
-            else:
-                trans["Withdrawal"] = amount_value
-                trans["Deposit"] = None
+def parse_file(pdf_file, filename, backend=None):
+    return to_frame(process_pdf(pdf_file, filename, backend), filename)
 
-            trans["Description"] = desc[:desc.rfind(amount_str)].strip()
-        else:
-            trans["Balance"] = None
+def combine(frames, opening_balance=None):
+    df = pd.concat(frames, ignore_index=True)
 
-    return transactions
+    # Drop unwanted description lines
+    return df[~df["Description"].str.contains(
+        "account type: current account|الإصدار|مدة الكشف",
+        case=False, na=False
+    )]
 
+@timing.timed_run
 def run():
     st.subheader("Bank PDF Processor")
     uploaded_files = st.file_uploader("Upload one or more PDF files", type="pdf", accept_multiple_files=True)
 
     if uploaded_files:
-        all_transactions = []
+        frames = []
         for uploaded_file in uploaded_files:
             st.info(f"Processing: {uploaded_file.name}")
-            transactions = process_pdf(uploaded_file, uploaded_file.name)
-            all_transactions.extend(transactions)
-
-        if all_transactions:
-            df = pd.DataFrame(all_transactions)
-
-            # Drop unwanted description lines
-            df = df[~df["Description"].str.contains(
-                "account type: current account|الإصدار|مدة الكشف",
-                case=False, na=False
-            )]
+            frames.append(incremental.parse(uploaded_file, __name__))
 
+        with timing.span("combine"):
+            df = incremental.combine(uploaded_files, frames, __name__)
+        if df is None:  # still parsing in the background
+            return
+        if not df.empty:
             st.success("Transactions Extracted:")
-            st.dataframe(df)
+            with timing.span("render"):
+                st.dataframe(df)
 
             # CSV download
-            csv = df.to_csv(index=False).encode('utf-8')
-            st.download_button("Download CSV", csv, "transactions.csv", "text/csv")
+            reconcile.panel(uploaded_files, __name__)
+            export.download_button("Download", df, "transactions", bank=__name__)
+            store.panel(uploaded_files, __name__, "transactions")
@@ -1,8 +1,20 @@
 import streamlit as st
-import pdfplumber
+import os
 import re
 import pandas as pd
 
+import export
+import incremental
+import page_text
+import reconcile
+import store
+import streaming
+import timing
+
+text_backend = os.environ.get("WIO_TEXT_BACKEND", "pdfplumber")  # see page_text.py
+
+PARSER_VERSION = f"4-{text_backend}"  # see parse_cache.py
+
 # ---------------------- PDF Parsing Logic ----------------------
 
 account_start_marker = "ACCOUNT STATEMENT ACCOUNT HOLDER NAME ACCOUNT TYPE CURRENCY"
@@ -10,75 +22,126 @@ txn_pattern = re.compile(
     r"(\d{2}/\d{2}/\d{4})\s+(\w+)\s+(.+?)\s+(-?\d{1,3}(?:,\d{3})*(?:\.\d+)?)\s+(-?\d{1,3}(?:,\d{3})*(?:\.\d+)?)"
 )
 
-def process_wio_pdfs(pdf_files):
-    all_transactions = []
-
-    for pdf_file in pdf_files:
-        all_lines = []
-
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                text = page.extract_text()
-                if text:
-                    all_lines.extend(text.splitlines())
-
-        # Identify blocks
-        blocks = []
-        current_block = []
-
-        for line in all_lines:
-            if account_start_marker in line:
-                if current_block:
-                    blocks.append(current_block)
-                    current_block = []
-            current_block.append(line)
-        if current_block:
-            blocks.append(current_block)
-
-        # Process blocks
-        for block in blocks:
-            block_text = "\n".join(block)
-
-            # Account Number
-            acct_match = re.search(r"\b(\d{10})\b", block_text)
-            account_number = acct_match.group(1) if acct_match else "Unknown"
-
-            # Currency
-            currency_match = re.search(r"(Current|Savings)\s+([A-Z]{3})", block_text)
-            currency = currency_match.group(2) if currency_match else "Unknown"
-
-            # Transaction lines
-            for i, line in enumerate(block):
-                if "Date Ref. Number" in line or (line.startswith("Date") and "Description" in line):
-                    txn_start = i + 1
-                    break
-            else:
-                txn_start = 0
-
-            for line in block[txn_start:]:
-                line = line.strip()
-                match = txn_pattern.match(line)
-                if match:
-                    date = match.group(1)
-                    ref = match.group(2)
-                    desc = match.group(3).strip()
-                    amount = float(match.group(4).replace(",", ""))
-                    balance = float(match.group(5).replace(",", ""))
-                    all_transactions.append({
-                        "Date": date,
-                        "Ref. Number": ref,
-                        "Description": desc,
-                        "Amount (Incl. VAT)": amount,
-                        "Balance": balance,
-                        "Currency": currency,
-                        "Account Number": account_number,
-                        "Source File": pdf_file.name
-                    })
-
-    return pd.DataFrame(all_transactions)
+account_pattern = re.compile(r"\b(\d{10})\b")
+currency_pattern = re.compile(r"(Current|Savings)\s+([A-Z]{3})")
+
+columns = [
+    "Date", "Ref. Number", "Description", "Amount (Incl. VAT)", "Balance",
+    "Currency", "Account Number", "Source File"
+]
+
+# Column map read by store.py, reconcile.py and schema.py; one statement can
+# hold several accounts, each with its own running balance
+fields = {"date": ("Date", "%d/%m/%Y"), "amount": "Amount (Incl. VAT)", "balance": "Balance",
+          "description": "Description", "source": "Source File", "account": "Account Number",
+          "currency": "Currency"}
+
+def is_header_line(line):
+    return "Date Ref. Number" in line or (line.startswith("Date") and "Description" in line)
+
+class AccountBlock:
+    """One account section of a statement, fed line by line.
+
+    Account number and currency are the first matches anywhere in the block and
+    only lines after the first header row count, so matched transaction lines
+    are held back until both are settled; at most the block preamble is kept.
+    """
+
+    __slots__ = ("filename", "preamble", "account_number", "currency", "header_seen", "pending")
+
+    def __init__(self, filename):
+        self.filename = filename
+        self.preamble = []
+        self.account_number = None
+        self.currency = None
+        self.header_seen = False
+        self.pending = []
+
+    def add(self, line):
+        if self.account_number is None or self.currency is None:
+            self.preamble.append(line)
+            block_text = "\n".join(self.preamble)
+            if self.account_number is None:
+                acct_match = account_pattern.search(block_text)
+                self.account_number = acct_match.group(1) if acct_match else None
+            if self.currency is None:
+                currency_match = currency_pattern.search(block_text)
+                self.currency = currency_match.group(2) if currency_match else None
+            if self.account_number is not None and self.currency is not None:
+                self.preamble = []
+
+        if not self.header_seen and is_header_line(line):
+            # Transactions start after the first header row
+            self.header_seen = True
+            self.pending = []
+            return self.ready()
+
+        match = txn_pattern.match(line.strip())
+        if match:
+            self.pending.append(match)
+        return self.ready()
+
+    def ready(self):
+        if not self.header_seen or self.account_number is None or self.currency is None:
+            return []
+        return self.flush()
+
+    def close(self):
+        # Without a header row the whole block counts, as in the batch parser
+        self.account_number = self.account_number or "Unknown"
+        self.currency = self.currency or "Unknown"
+        return self.flush()
+
+    def flush(self):
+        transactions = []
+        for match in self.pending:
+            transactions.append((
+                match.group(1),
+                match.group(2),
+                match.group(3).strip(),
+                float(match.group(4).replace(",", "")),
+                float(match.group(5).replace(",", "")),
+                self.currency,
+                self.account_number,
+                self.filename
+            ))
+        self.pending = []
+        return transactions
+
+# Stream transactions page by page; account blocks may span pages
+def iter_pages(pdf_file, filename, backend=None):
+    block = None
+
+    for page_no, page_count, lines in page_text.iter_lines(pdf_file, backend or text_backend):
+        transactions = []
+        for line in lines:
+            if account_start_marker in line and block is not None:
+                transactions.extend(block.close())
+                block = None
+            if block is None:
+                block = AccountBlock(filename)
+            transactions.extend(block.add(line))
+
+        if page_no == page_count and block is not None:
+            transactions.extend(block.close())
+
+        yield page_no, page_count, transactions
+
+def extract_wio_transactions(pdf_file, filename, backend=None):
+    return streaming.collect(iter_pages(pdf_file, filename, backend), columns)
+
+def to_frame(buffer, filename=None):
+    return buffer.to_frame()
+
+def parse_file(pdf_file, filename, backend=None):
+    return to_frame(extract_wio_transactions(pdf_file, filename, backend), filename)
+
+def combine(frames, opening_balance=None):
+    return pd.concat(frames, ignore_index=True)
 
 # ---------------------- Streamlit UI ----------------------
 
+@timing.timed_run
 def run():
     st.subheader("Bank PDF Processor")
 
@@ -86,13 +149,19 @@ def run():
 
     if uploaded_files:
         st.info("Processing uploaded file(s)...")
-        df = process_wio_pdfs(uploaded_files)
+        frames = [incremental.parse(file, __name__) for file in uploaded_files]
+        with timing.span("combine"):
+            df = incremental.combine(uploaded_files, frames, __name__)
+        if df is None:  # still parsing in the background
+            return
 
         if df.empty:
             st.warning("⚠️ No transactions found in any uploaded files.")
         else:
             st.success(f"✅ Extracted {len(df)} transactions from {len(uploaded_files)} PDF(s)")
-            st.dataframe(df)
+            with timing.span("render"):
+                st.dataframe(df)
 
-            csv = df.to_csv(index=False).encode("utf-8")
-            st.download_button("Download CSV", csv, "wio_bank_transactions.csv", "text/csv")
+            reconcile.panel(uploaded_files, __name__)
+            export.download_button("Download", df, "wio_bank_transactions", bank=__name__)
+            store.panel(uploaded_files, __name__, "wio_bank_transactions")
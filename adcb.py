@@ -1,38 +1,202 @@
-import pdfplumber
+import os
+import re
+import bisect
 import pandas as pd
 import streamlit as st
 from io import BytesIO
 
+import export
+import incremental
+import page_pool
+import page_triage
+import reconcile
+import spool
+import store
+import streaming
+import timing
+
+PARSER_VERSION = "4"  # see parse_cache.py
+
 expected_headers = [
     "Posting Date", "Value Date", "Description", "Ref/Cheque No",
     "Debit Amount", "Credit Amount", "Balance"
 ]
+columns = expected_headers
+
+# Column map read by store.py, reconcile.py and schema.py
+fields = {"date": ("Posting Date", "%d/%m/%Y"), "value_date": ("Value Date", "%d/%m/%Y"), "debit": "Debit Amount",
+          "credit": "Credit Amount", "balance": "Balance", "description": "Description"}
+
+# "pdfplumber" (table detection) or "pymupdf" (word coordinates, much faster)
+backends = ["pdfplumber", "pymupdf"]
+default_backend = os.environ.get("ADCB_BACKEND", "pdfplumber")
+
+# ---------------------- pdfplumber backend ----------------------
 
-def extract_transactions_from_pdf(file):
-    all_data = []
+# Table detection only runs on pages with the header row or dated rows (see page_triage.py)
+page_probe = page_triage.PageProbe(r"\d{2}/\d{2}/\d{4}", markers=["Posting Date"])
+
+def extract_page_rows(page):
+    rows = []
+    with timing.span("extract_table"):
+        tables = page.extract_tables()
+    for table in tables:
+        for row in table:
+            rows.append([cell.strip() if isinstance(cell, str) else "" for cell in row])
+    return rows
+
+def iter_pages_pdfplumber(file):
     header_found = False
     header_index = []
 
-    with pdfplumber.open(file) as pdf:
-        for page in pdf.pages:
-            tables = page.extract_tables()
-            for table in tables:
-                for row in table:
-                    clean_row = [cell.strip() if isinstance(cell, str) else "" for cell in row]
-
-                    if not header_found and set(expected_headers).issubset(set(clean_row)):
-                        header_found = True
-                        header_index = [clean_row.index(col) for col in expected_headers]
-                        continue
-
-                    elif header_found:
-                        if set(expected_headers).issubset(set(clean_row)):
-                            continue
-                        if len(clean_row) >= max(header_index) + 1:
-                            selected_row = [clean_row[i] for i in header_index]
-                            all_data.append(selected_row)
-    return all_data
+    # Table detection runs per page in parallel; header state is replayed in page order
+    pages = page_triage.select(file, page_probe)
+    for page_no, page_count, page_rows in page_pool.imap_pages(file, extract_page_rows, pages):
+        all_data = []
+        for clean_row in page_rows:
+            if not header_found and set(expected_headers).issubset(set(clean_row)):
+                header_found = True
+                header_index = [clean_row.index(col) for col in expected_headers]
+                continue
+
+            elif header_found:
+                if set(expected_headers).issubset(set(clean_row)):
+                    continue
+                if len(clean_row) >= max(header_index) + 1:
+                    selected_row = [clean_row[i] for i in header_index]
+                    all_data.append(selected_row)
+        yield page_no, page_count, all_data
+
+# ---------------------- PyMuPDF backend ----------------------
+# Words are binned into the expected_headers columns by x-position learned
+# from the header row. A row starts at a line whose Posting Date cell is a
+# date; a line directly below it continues its wrapped cells, joined with "\n"
+# as pdfplumber does for table cells. Any other line (page footer, T&C text)
+# closes the table until the next header or dated row, and pages are triaged
+# with the same probe as the pdfplumber path.
+
+posting_date = re.compile(r"\d{2}/\d{2}/\d{4}$")
+
+def group_visual_lines(words, tolerance=2.0):
+    lines = []
+    for word in sorted(words, key=lambda w: (round(w[1]), w[0])):
+        if lines and abs(word[1] - lines[-1][0][1]) <= tolerance:
+            lines[-1].append(word)
+        else:
+            lines.append([word])
+    return [sorted(line, key=lambda w: w[0]) for line in lines]
+
+def find_header_columns(line):
+    texts = [w[4] for w in line]
+    used = set()
+    spans = []
+    for header in expected_headers:
+        tokens = header.split()
+        for start in range(len(texts) - len(tokens) + 1):
+            span = range(start, start + len(tokens))
+            if texts[start:start + len(tokens)] == tokens and not used.intersection(span):
+                used.update(span)
+                spans.append((line[start][0], line[start + len(tokens) - 1][2]))
+                break
+        else:
+            return None
+    return spans
+
+def column_bounds(spans):
+    # Split between neighbouring headers; returns (sorted boundaries, column order)
+    order = sorted(range(len(spans)), key=lambda i: spans[i][0])
+    bounds = [
+        (spans[order[k]][1] + spans[order[k + 1]][0]) / 2
+        for k in range(len(order) - 1)
+    ]
+    return bounds, order
+
+def iter_pages_pymupdf(file):
+    bounds = order = None
+
+    with timing.span("open"):
+        doc = spool.open_pymupdf(file)
+    # Closed on return and also when the caller abandons the generator (a cancelled job)
+    with doc:
+        page_count = doc.page_count
+        for page_no, page in enumerate(doc, 1):
+            all_data = []
+            with timing.span("extract_words"):
+                words = page.get_text("words")
+            lines = group_visual_lines(words)
+            if not page_triage.keep([" ".join(w[4] for w in line) for line in lines], page_probe):
+                yield page_no, page_count, all_data
+                continue
+
+            current = None
+            prev_bottom = None
+            for line in lines:
+                spans = find_header_columns(line)
+                if spans:
+                    # Text above a header row (letterhead, titles) is not part of the table
+                    bounds, order = column_bounds(spans)
+                    if current:
+                        all_data.append(current)
+                    current = None
+                    prev_bottom = max(w[3] for w in line)
+                    continue
+                if bounds is None:
+                    continue
+
+                cells = [[] for _ in expected_headers]
+                for x0, y0, x1, y1, text, *_ in line:
+                    cells[order[bisect.bisect(bounds, (x0 + x1) / 2)]].append(text)
+                cells = [" ".join(cell) for cell in cells]
 
+                top = min(w[1] for w in line)
+                height = max(w[3] - w[1] for w in line)
+                adjacent = prev_bottom is not None and top - prev_bottom <= height
+
+                if posting_date.match(cells[0]):
+                    if current:
+                        all_data.append(current)
+                    current = cells
+                elif current and adjacent:
+                    current = [
+                        f"{old}\n{new}" if old and new else old or new
+                        for old, new in zip(current, cells)
+                    ]
+                else:
+                    # Neither a row nor its continuation: the table has ended
+                    if current:
+                        all_data.append(current)
+                    current = None
+                prev_bottom = max(w[3] for w in line) if current else None
+
+            # Table rows never continue across a page break
+            if current:
+                all_data.append(current)
+
+            yield page_no, page_count, all_data
+
+# Stream rows page by page from the selected backend
+def iter_pages(file, filename=None, backend=None):
+    if (backend or default_backend) == "pymupdf":
+        return iter_pages_pymupdf(file)
+    return iter_pages_pdfplumber(file)
+
+def extract_transactions_from_pdf(file, backend=None):
+    return streaming.collect(iter_pages(file, backend=backend), columns)
+
+# Headless entry points (used by run() and batch_convert)
+def to_frame(buffer, filename=None):
+    return buffer.to_frame()
+
+def parse_file(file, filename, backend=None):
+    return to_frame(extract_transactions_from_pdf(file, backend), filename)
+
+def combine(frames, opening_balance=None):
+    df = pd.concat(frames, ignore_index=True)
+    df.dropna(how='all', inplace=True)
+    df.reset_index(drop=True, inplace=True)
+    return df
+
+@timing.timed_run
 def run():
     #st.markdown("Bank PDF Processor")
     st.subheader("Bank PDF Processor")
@@ -45,26 +209,34 @@ def run():
         label_visibility="collapsed"
     )
 
+    backend = st.radio(
+        "Extraction engine", backends, index=backends.index(default_backend), horizontal=True
+    )
+
     if not uploaded_files:
         st.info("📂 Please upload one or more PDF files.")
         return
 
-    combined_data = []
+    frames = []
 
     for file in uploaded_files:
         st.info(f"🔍 Processing: {file.name}")
-        transactions = extract_transactions_from_pdf(file)
-        combined_data.extend(transactions)
+        frames.append(incremental.parse(
+            file, __name__, namespace=f"{__name__}-{backend}", backend=backend
+        ))
 
-    df = pd.DataFrame(combined_data, columns=expected_headers)
-    df.dropna(how='all', inplace=True)
-    df.reset_index(drop=True, inplace=True)
+    with timing.span("combine"):
+        df = incremental.combine(uploaded_files, frames, __name__, namespace=f"{__name__}-{backend}")
+    if df is None:  # still parsing in the background
+        return
 
     st.success("✅ Extraction complete!")
-    st.dataframe(df)
+    with timing.span("render"):
+        st.dataframe(df)
 
-    csv = df.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇️ Download CSV", csv, "adcb_transactions.csv", "text/csv")
+    reconcile.panel(uploaded_files, __name__, namespace=f"{__name__}-{backend}")
+    export.download_button("⬇️ Download", df, "adcb_transactions", bank=__name__)
+    store.panel(uploaded_files, __name__, "adcb_transactions", namespace=f"{__name__}-{backend}")
 
 # For standalone run
 if __name__ == "__main__":
@@ -1,63 +1,92 @@
 import streamlit as st
-import fitz  # PyMuPDF
 import re
 import pandas as pd
 import io
+import os
+
+import export
+import incremental
+import page_text
+import reconcile
+import store
+import streaming
+import timing
+from transaction_buffer import PendingTransaction
+
+# The parser reads raw lines, blank ones included
+text_backend = os.environ.get("ADIB_TEXT_BACKEND", "pymupdf")  # see page_text.py
+
+PARSER_VERSION = f"1-{text_backend}"  # see parse_cache.py
 
 # === Patterns ===
 date_pattern = re.compile(r'^\d{2}-\d{2}-\d{4}$')
 
-# === Extract and structure transactions ===
-def extract_and_structure_transactions_from_bytes(file_bytes, filename):
-    doc = fitz.open(stream=file_bytes, filetype="pdf")
-    all_lines = []
-
-    for page in doc:
-        lines = page.get_text().splitlines()
-        for line in lines:
+header_lines = [
+    "Transaction Date", "Value Date", "Narrative",
+    "Transaction Reference", "Debit", "Credit", "Running Balance"
+]
+
+columns = [
+    "Transaction Date", "Value Date", "Narrative",
+    "Transaction Reference", "Debit", "Credit", "Running Balance", "Source File"
+]
+
+# Column map read by store.py, reconcile.py and schema.py
+fields = {"date": ("Transaction Date", "%d-%m-%Y"), "value_date": ("Value Date", "%d-%m-%Y"), "debit": "Debit",
+          "credit": "Credit", "balance": "Running Balance", "description": "Narrative", "source": "Source File"}
+
+# === Structure one transaction (dates, narrative lines, then the last four fields) ===
+def structure_transaction(pending, filename):
+    txn = [pending.date, pending.value_date] + pending.lines
+    try:
+        txn_date = txn[0]
+        value_date = txn[1]
+        reference = txn[-4]
+        debit = txn[-3]
+        credit = txn[-2]
+        balance = txn[-1]
+        narrative = " ".join(txn[2:-4]).strip()
+
+        return [txn_date, value_date, narrative, reference, debit, credit, balance, filename]
+    except:
+        return None
+
+# === Stream transactions page by page ===
+# A transaction starts at two consecutive date lines and runs until the next
+# such pair, so one line of lookahead is carried between lines (and pages).
+def iter_pages(file, filename, backend=None):
+    txn_buffer = None
+    pending = None
+
+    for page_no, page_count, text in page_text.iter_texts(file, backend or text_backend):
+        transactions = []
+        for line in text.splitlines():
             line = line.strip()
-            if line not in [
-                "Transaction Date", "Value Date", "Narrative",
-                "Transaction Reference", "Debit", "Credit", "Running Balance"
-            ]:
-                all_lines.append(line)
-
-    transactions = []
-    i = 0
-    while i < len(all_lines) - 1:
-        if date_pattern.match(all_lines[i]) and date_pattern.match(all_lines[i + 1]):
-            txn_buffer = [all_lines[i], all_lines[i + 1]]
-            i += 2
-            while i < len(all_lines):
-                if i + 1 < len(all_lines) and date_pattern.match(all_lines[i]) and date_pattern.match(all_lines[i + 1]):
-                    break
-                txn_buffer.append(all_lines[i])
-                i += 1
+            if line in header_lines:
+                continue
+
+            if pending is None:
+                pending = line
+            elif date_pattern.match(pending) and date_pattern.match(line):
+                if txn_buffer is not None:
+                    transactions.append(txn_buffer)
+                txn_buffer = PendingTransaction(pending, line)
+                pending = None
+            else:
+                if txn_buffer is not None:
+                    txn_buffer.add(pending)
+                pending = line
+
+        if page_no == page_count and txn_buffer is not None:
+            if pending is not None:
+                txn_buffer.add(pending)
             transactions.append(txn_buffer)
-        else:
-            i += 1
-
-    structured_data = []
-    for txn in transactions:
-        try:
-            txn_date = txn[0]
-            value_date = txn[1]
-            reference = txn[-4]
-            debit = txn[-3]
-            credit = txn[-2]
-            balance = txn[-1]
-            narrative = " ".join(txn[2:-4]).strip()
-
-            structured_data.append([
-                txn_date, value_date, narrative, reference, debit, credit, balance, filename
-            ])
-        except:
-            pass
-
-    df = pd.DataFrame(structured_data, columns=[
-        "Transaction Date", "Value Date", "Narrative",
-        "Transaction Reference", "Debit", "Credit", "Running Balance", "Source File"
-    ])
+
+        structured_data = [structure_transaction(txn, filename) for txn in transactions]
+        yield page_no, page_count, [row for row in structured_data if row is not None]
+
+def to_frame(buffer, filename=None):
+    df = buffer.to_frame()
 
     df = df[~df["Running Balance"].str.contains("Page", case=False, na=False)]
 
@@ -66,7 +95,19 @@ def extract_and_structure_transactions_from_bytes(file_bytes, filename):
 
     return df
 
+# === Extract and structure transactions ===
+def extract_and_structure_transactions_from_bytes(file_bytes, filename, backend=None):
+    return to_frame(streaming.collect(iter_pages(file_bytes, filename, backend), columns), filename)
+
+# === Headless entry points (used by run() and batch_convert) ===
+def parse_file(file, filename, backend=None):
+    return extract_and_structure_transactions_from_bytes(file, filename, backend)
+
+def combine(frames, opening_balance=None):
+    return pd.concat(frames, ignore_index=True)
+
 # === Streamlit Integration ===
+@timing.timed_run
 def run():
     #st.title("Bank PDF Processor")
     st.subheader("Bank PDF Processor")
@@ -74,22 +115,22 @@ def run():
     uploaded_files = st.file_uploader("Upload ADIB Bank PDF statements", type="pdf", accept_multiple_files=True)
 
     if uploaded_files:
-        combined_df = pd.DataFrame()
+        frames = []
 
         for file in uploaded_files:
-            file_bytes = file.read()
-            df = extract_and_structure_transactions_from_bytes(file_bytes, file.name)
-            combined_df = pd.concat([combined_df, df], ignore_index=True)
+            frames.append(incremental.parse(file, __name__))
+
+        with timing.span("combine"):
+            combined_df = incremental.combine(uploaded_files, frames, __name__)
+        if combined_df is None:  # still parsing in the background
+            return
 
         if not combined_df.empty:
-            st.dataframe(combined_df)
-
-            # Download as CSV
-            csv_data = combined_df.to_csv(index=False).encode('utf-8')
-            st.download_button(
-                "📥 Download CSV",
-                data=csv_data,
-                file_name="adib_transactions.csv",
-                mime="text/csv"
-            )
+            with timing.span("render"):
+                st.dataframe(combined_df)
+
+            # Download (built only when clicked)
+            reconcile.panel(uploaded_files, __name__)
+            export.download_button("📥 Download", combined_df, "adib_transactions", bank=__name__)
+            store.panel(uploaded_files, __name__, "adib_transactions")
 
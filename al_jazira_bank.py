@@ -1,68 +1,89 @@
 import streamlit as st
-import pdfplumber
 import pandas as pd
 import re
 from io import BytesIO
 
-# 🔢 Convert Arabic-Indic digits to Western numerals
+import export
+import incremental
+import page_pool
+import page_triage
+import reconcile
+import store
+import streaming
+import timing
+
+PARSER_VERSION = "4"  # see parse_cache.py
+
+columns = ["Transaction Date", "Value Date", "Description", "Withdrawal (Dr)", "Deposit (Cr)", "Running Balance"]
+
+# Column map read by store.py, reconcile.py and schema.py
+fields = {"date": ("Transaction Date", "%d/%m/%Y"), "value_date": ("Value Date", "%d/%m/%Y"),
+          "debit": "Withdrawal (Dr)", "credit": "Deposit (Cr)", "balance": "Running Balance",
+          "description": "Description"}
+
+# 🔢 Convert Arabic-Indic digits to Western numerals (one C-level pass per string)
+arabic_indic_digits = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+
 def convert_arabic_indic_to_western(text):
-    arabic_indic_numerals = {
-        '٠': '0', '١': '1', '٢': '2', '٣': '3', '٤': '4',
-        '٥': '5', '٦': '6', '٧': '7', '٨': '8', '٩': '9'
-    }
-    for arabic_num, western_num in arabic_indic_numerals.items():
-        text = text.replace(arabic_num, western_num)
-    return text
-
-# 📝 Extract transactions using structural table extraction (column-wise)
+    return text.translate(arabic_indic_digits)
+
+# 📝 Extract transactions from one page using structural table extraction (column-wise)
+def extract_page_transactions(page):
+    with timing.span("extract_table"):
+        table = page.extract_table()
+    if not table:
+        return []
+
+    # Set expected column names (adjust if needed)
+    if any(len(row) != len(columns) for row in table):
+        raise ValueError(f"Expected {len(columns)} table columns on page {page.page_number}")
+
+    # Keep rows that have a transaction date and a description, minus the
+    # header row every page repeats
+    table = [row for row in table if row[0] is not None and row[2] is not None and columns[0] not in row[0]]
+
+    # Convert Arabic-Indic numerals to Western, one column at a time
+    page_columns = [
+        [convert_arabic_indic_to_western(cell) if cell is not None else None for cell in column]
+        for column in zip(*table)
+    ]
+
+    return list(zip(*page_columns))
+
+# 🔎 Table detection only runs on pages with dated rows (see page_triage.py)
+page_probe = page_triage.PageProbe(r"\d{1,2}/\d{1,2}/\d{4}", markers=["Running Balance"])
+
+# 📝 Stream transactions page by page (pages run in parallel on long statements)
+def iter_pages(pdf_bytes, filename=None):
+    return page_pool.imap_pages(pdf_bytes, extract_page_transactions, page_triage.select(pdf_bytes, page_probe))
+
+# One frame per file, built column-wise from the buffer
+def to_frame(buffer, filename=None):
+    return buffer.to_frame()
+
 def extract_transactions_structural(pdf_bytes):
-    transactions = []
-    with pdfplumber.open(pdf_bytes) as pdf:
-        for page in pdf.pages:
-            table = page.extract_table()
-            if not table:
-                continue
-
-            df = pd.DataFrame(table)
-
-            # Set expected column names (adjust if needed)
-            df.columns = ["Transaction Date", "Value Date", "Description", "Withdrawal (Dr)", "Deposit (Cr)", "Running Balance"]
-            df = df.dropna(subset=["Transaction Date", "Description"]).reset_index(drop=True)
-
-            # Convert Arabic-Indic numerals to Western
-            df = df.applymap(lambda x: convert_arabic_indic_to_western(str(x)) if pd.notnull(x) else x)
-
-            for _, row in df.iterrows():
-                transaction = {
-                    "Transaction Date": row["Transaction Date"],
-                    "Value Date": row["Value Date"],
-                    "Description": row["Description"],
-                    "Withdrawal (Dr)": row["Withdrawal (Dr)"],
-                    "Deposit (Cr)": row["Deposit (Cr)"],
-                    "Running Balance": row["Running Balance"]
-                }
-                transactions.append(transaction)
-
-    return pd.DataFrame(transactions)
+    return to_frame(streaming.collect(iter_pages(pdf_bytes), columns))
+
+# 🧩 Headless entry points (used by run() and batch_convert)
+def parse_file(pdf_file, filename):
+    return extract_transactions_structural(pdf_file)
+
+def combine(frames, opening_balance=None):
+    frames = [df for df in frames if not df.empty]
+    if frames:
+        return pd.concat(frames, ignore_index=True)
+    return pd.DataFrame()
 
 # ✅ Processing multiple PDFs
 def process(pdf_files):
     st.info("Extracting transactions from Aljazira Bank statements...")
 
-    all_transactions = []
-
-    for pdf_file in pdf_files:
-        df = extract_transactions_structural(pdf_file)
-        if not df.empty:
-            all_transactions.append(df)
-
-    if all_transactions:
-        final_df = pd.concat(all_transactions, ignore_index=True)
-        return final_df
-    else:
-        return pd.DataFrame()
+    frames = [incremental.parse(pdf_file, __name__) for pdf_file in pdf_files]
+    with timing.span("combine"):
+        return incremental.combine(pdf_files, frames, __name__)
 
 # ✅ Required run() function for Streamlit
+@timing.timed_run
 def run():
     #st.header("Bank PDF Processor")
     st.subheader("Bank PDF Processor")
@@ -75,12 +96,16 @@ def run():
 
     if uploaded_files:
         df = process(uploaded_files)
+        if df is None:  # still parsing in the background
+            return
 
         if df.empty:
             st.warning("⚠️ No structured transactions found in the uploaded PDFs.")
         else:
             st.success("✅ Transactions extracted successfully!")
-            st.dataframe(df)
+            with timing.span("render"):
+                st.dataframe(df)
 
-            csv = df.to_csv(index=False).encode("utf-8")
-            st.download_button("Download CSV", csv, "al_jazira_transactions.csv", "text/csv")
+            reconcile.panel(uploaded_files, __name__)
+            export.download_button("Download", df, "al_jazira_transactions", bank=__name__)
+            store.panel(uploaded_files, __name__, "al_jazira_transactions")
@@ -0,0 +1,161 @@
+# bank_detect.py – Route each uploaded statement to its bank parser
+#
+# Only the first page's PyMuPDF text layer is read (no table extraction), and
+# it is scanned once by a single compiled alternation built from the markers
+# each bank module already relies on. Typical cost is a few milliseconds per file.
+
+import re
+import time
+
+import pandas as pd
+import streamlit as st
+
+import export
+import incremental
+import reconcile
+import spool
+import store
+import timing
+from bank_registry import bank_modules
+
+# ==== Fingerprint index: module → (marker, weight) ====
+# Markers mirror the constants in each module (headers, noise phrases, block
+# markers) plus the bank's own name as printed on its statements.
+fingerprints = {
+    "Wio_bank": [
+        ("ACCOUNT STATEMENT ACCOUNT HOLDER NAME ACCOUNT TYPE CURRENCY", 5),  # account_start_marker
+        ("Date Ref. Number", 3),
+        ("Wio Bank", 3),
+    ],
+    "adcb": [
+        ("Posting Date", 2), ("Ref/Cheque No", 3),  # expected_headers
+        ("Debit Amount", 1), ("Credit Amount", 1),
+        ("Abu Dhabi Commercial Bank", 3), ("ADCB", 2),
+    ],
+    "adib_bank": [
+        ("Running Balance", 1), ("Narrative", 2), ("Transaction Reference", 2),
+        ("Abu Dhabi Islamic Bank", 3), ("ADIB", 2),
+    ],
+    "emirates_islamic_bank": [
+        ("Narration", 2), ("Running Balance", 1),  # header_keywords
+        ("Emirates Islamic", 4),
+    ],
+    "fab_bank": [
+        ("First Abu Dhabi Bank PJSC", 5), ("Balance brought forward", 2),  # unwanted_phrases
+        ("Sheet no", 1), ("Old Account Number", 1),
+        ("Date Value Date Description Debit Credit Balance", 3),  # process_pdf header filter
+    ],
+    "Rak_Bank": [
+        ("your current account transactions", 4), ("date issued", 2),
+        ("RAKBANK", 3), ("National Bank of Ras Al Khaimah", 3),
+    ],
+    "mashreq": [
+        ("Date Transaction Reference Number Debit Balance Credit", 4),  # header_pattern
+        ("The items and balance shown", 2), ("Mashreq", 3),
+    ],
+    "al_jazira_bank": [
+        ("Withdrawal (Dr)", 2), ("Deposit (Cr)", 2), ("Aljazira", 3), ("Al Jazira", 3),
+    ],
+}
+
+MIN_SCORE = 3
+
+
+def _normalize(marker):
+    return re.sub(r"\s+", " ", marker).strip().lower()
+
+
+# One pattern for every marker; whitespace inside markers matches any run of whitespace
+_weights = {}
+for _bank, _markers in fingerprints.items():
+    for _marker, _weight in _markers:
+        _weights.setdefault(_normalize(_marker), []).append((_bank, _weight))
+
+_marker_pattern = re.compile(
+    "|".join(
+        r"\s+".join(re.escape(word) for word in marker.split(" "))
+        for marker in sorted(_weights, key=len, reverse=True)
+    ),
+    re.IGNORECASE
+)
+
+
+# ==== Detection ====
+def first_page_text(file):
+    with spool.open_pymupdf(file) as doc:
+        if doc.page_count == 0:
+            return ""
+        return doc[0].get_text("text")
+
+
+def score_text(text):
+    scores = {}
+    for marker in {_normalize(m.group()) for m in _marker_pattern.finditer(text)}:
+        for bank, weight in _weights.get(marker, []):
+            scores[bank] = scores.get(bank, 0) + weight
+    return scores
+
+
+def detect(file):
+    """Return the module name of the bank that issued this statement, or None."""
+    try:
+        scores = score_text(first_page_text(file))
+    except Exception:
+        return None
+    if not scores:
+        return None
+    ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+    best, best_score = ranked[0]
+    if best_score < MIN_SCORE or (len(ranked) > 1 and ranked[1][1] == best_score):
+        return None
+    return best
+
+
+# ==== Streamlit UI ====
+@timing.timed_run
+def run():
+    st.subheader("Bank PDF Processor")
+
+    uploaded_files = st.file_uploader(
+        "Upload statements from any supported bank",
+        type="pdf",
+        accept_multiple_files=True
+    )
+
+    if not uploaded_files:
+        st.info("📂 Upload one or more PDF files; each is routed to its bank's parser.")
+        return
+
+    labels = {module_name: label for label, module_name in bank_modules.items()}
+    groups = {}
+    routing = []
+    for file in uploaded_files:
+        started = time.perf_counter()
+        bank = detect(file)
+        routing.append({
+            "File": file.name,
+            "Bank": labels.get(bank, bank or "❓ Not recognised"),
+            "Detection (ms)": round((time.perf_counter() - started) * 1000, 1)
+        })
+        if bank in labels:
+            groups.setdefault(bank, []).append(file)
+
+    st.dataframe(pd.DataFrame(routing))
+
+    for bank, files in groups.items():
+        st.markdown(f"#### {labels[bank]}")
+        frames = [incremental.parse(file, bank) for file in files]
+        with timing.span("combine"):
+            df = incremental.combine(files, frames, bank)
+        if df is None:  # still parsing in the background
+            continue
+
+        if df.empty:
+            st.warning("⚠️ No transactions found.")
+            continue
+
+        with timing.span("render"):
+            st.dataframe(df)
+        reconcile.panel(files, bank)
+        export.download_button("Download", df, f"{bank.lower()}_transactions", key=f"download-{bank}", bank=bank)
+        store.panel(files, bank, f"{bank.lower()}_transactions", key=f"store-{bank}")
@@ -0,0 +1,32 @@
+# bank_registry.py – Label → bank module mapping shared by App.py and batch_convert
+#
+# Modules are named, not imported: each bank module (and the PDF library it
+# pulls in) is imported on first use, so App.py paints without loading
+# PyMuPDF, PyPDF2, pdfplumber or pandas. See benchmarks/cold_start.py.
+
+import importlib
+
+# ==== Bank Mapping ====
+# Al Jazira is listed while its pages/s stays within 25% of the other
+# pdfplumber table parsers (ADCB, Emirates Islamic) in the same
+# benchmarks/throughput.py run.
+bank_modules = {
+    "🏦 RAK Bank": "Rak_Bank",
+    "🏛️ Al Jazira Bank": "al_jazira_bank",
+    "🏢 Emirates Islamic Bank": "emirates_islamic_bank",
+    "🏬 FAB Bank": "fab_bank",
+    "🏛️ WIO Bank": "Wio_bank",
+    "🏤 ADIB Bank": "adib_bank",
+    "🏤 Mashreq Neo Bank": "mashreq",
+    "🏤 ADCB Bank": "adcb"
+}
+
+
+def resolve(bank):
+    """Import and return a bank module by its UI label or module name (e.g. ``fab_bank``)."""
+    if bank in bank_modules:
+        return importlib.import_module(bank_modules[bank])
+    for module_name in bank_modules.values():
+        if module_name.lower() == bank.lower():
+            return importlib.import_module(module_name)
+    raise KeyError(bank)
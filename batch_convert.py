@@ -0,0 +1,159 @@
+# batch_convert.py – Headless batch conversion of a directory of statements
+#
+# Usage:
+#   python batch_convert.py statements/ --bank fab_bank --workers 8 -o fab.csv
+#   python batch_convert.py "2024/**/*.pdf" --bank "🏤 ADCB Bank" -o adcb.parquet
+#   python batch_convert.py q1/ --bank fab_bank --store fab.sqlite3 --account main -o fab_all.csv
+#
+# Files are parsed in a process pool; a failing file is reported and skipped
+# without aborting the rest of the batch. Each file logs one JSON timing line
+# (see timing.py), and running-balance breaks are listed by page at the end
+# (see reconcile.py). With --store (or BANK_STORE_PATH) the batch is saved to the
+# transaction store and the output holds everything stored for the account,
+# with rows already stored from earlier statements counted once (see store.py).
+# Parquet and Arrow outputs use the bank's typed schema (see schema.py).
+
+import argparse
+import glob
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+import export
+import ocr
+import page_pool
+import store
+import streaming
+from bank_registry import resolve
+
+
+# ==== Input discovery ====
+def collect_files(source):
+    if os.path.isdir(source):
+        paths = glob.glob(os.path.join(source, "*.pdf")) + glob.glob(os.path.join(source, "*.PDF"))
+    else:
+        paths = glob.glob(source, recursive=True)
+    return sorted(set(p for p in paths if os.path.isfile(p)))
+
+
+def count_pages(path):
+    try:
+        import fitz  # PyMuPDF
+        with fitz.open(path) as doc:
+            return doc.page_count
+    except Exception:
+        return 0
+
+
+# ==== Worker ====
+def parse_one(module_name, path):
+    """Parse a single file in a worker process; never raises."""
+    started = time.perf_counter()
+    result = {"path": path, "frame": None, "report": None, "pages": 0, "error": None}
+    try:
+        with open(path, "rb") as fh:
+            result["frame"], result["report"] = streaming.parse(fh, module_name, filename=os.path.basename(path))
+        result["pages"] = count_pages(path)
+    except Exception as exc:
+        result["error"] = f"{type(exc).__name__}: {exc}\n{traceback.format_exc(limit=3)}"
+    result["seconds"] = time.perf_counter() - started
+    return result
+
+
+# ==== Batch ====
+def init_worker():
+    # Files are the unit of parallelism here, so pages run inline in each worker
+    page_pool.disable()
+    ocr.disable()
+
+
+def convert(paths, module, workers, opening_balance=None, log=sys.stderr):
+    results = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=init_worker) as pool:
+        futures = {pool.submit(parse_one, module.__name__, path): path for path in paths}
+        for future in as_completed(futures):
+            path = futures[future]
+            try:
+                result = future.result()
+            except Exception as exc:  # worker process died
+                result = {"path": path, "frame": None, "report": None, "pages": 0, "seconds": 0.0,
+                          "error": f"{type(exc).__name__}: {exc}"}
+            results[path] = result
+            status = "FAILED" if result["error"] else f"{len(result['frame'])} rows"
+            if result["report"] is not None and not result["report"].ok:
+                status += f", {len(result['report'].breaks)} balance break(s)"
+            print(f"[{len(results)}/{len(paths)}] {os.path.basename(path)}: {status}", file=log)
+
+    # Keep input order: cross-file columns (e.g. FAB balance diffs) depend on it
+    ordered = [results[path] for path in paths]
+    frames = [r["frame"] for r in ordered if r["error"] is None]
+    combined = module.combine(frames, opening_balance) if frames else pd.DataFrame()
+    return combined, ordered
+
+
+def summarize(results, elapsed, log=sys.stderr):
+    ok = [r for r in results if r["error"] is None]
+    failed = [r for r in results if r["error"] is not None]
+    pages = sum(r["pages"] for r in ok)
+    rate = lambda n: n / elapsed if elapsed > 0 else 0.0
+
+    for r in failed:
+        print(f"\n✗ {r['path']}\n{r['error']}", file=log)
+    for r in ok:
+        if r["report"] is not None and not r["report"].ok:
+            break_pages = sorted(set(r["report"].breaks["Page"].dropna().astype(int)))
+            print(f"\n⚠ {r['path']}: {len(r['report'].breaks)} running-balance break(s) on page(s) "
+                  f"{', '.join(map(str, break_pages)) or '?'}", file=log)
+
+    print(
+        f"\n{len(ok)} file(s) parsed, {len(failed)} failed, {pages} page(s) in {elapsed:.2f}s "
+        f"— {rate(len(ok)):.2f} files/s, {rate(pages):.1f} pages/s",
+        file=log
+    )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert a batch of bank statement PDFs to one CSV.")
+    parser.add_argument("source", help="Directory of PDFs or a glob pattern")
+    parser.add_argument("--bank", required=True, help="Bank label from bank_modules or module name, e.g. fab_bank")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes (default: CPU count)")
+    parser.add_argument("-o", "--output", default="transactions.csv",
+                        help="Combined output file; .parquet or .arrow selects that format")
+    parser.add_argument("--opening-balance", type=float, default=None, help="Opening balance, for banks that use one")
+    parser.add_argument("--store", default=store.PATH or None, metavar="DB",
+                        help="Save to this transaction store and export the account's stored rows")
+    parser.add_argument("--account", default=None,
+                        help="Account to save under and export (default: every stored account of the bank);"
+                             " for banks whose statements print it, the printed account number")
+    args = parser.parse_args(argv)
+
+    try:
+        module = resolve(args.bank)
+    except KeyError:
+        parser.error(f"unknown bank {args.bank!r}")
+
+    paths = collect_files(args.source)
+    if not paths:
+        parser.error(f"no PDF files found for {args.source!r}")
+
+    started = time.perf_counter()
+    combined, results = convert(paths, module, args.workers, args.opening_balance)
+    if args.store:
+        frames = [r["frame"] for r in results if r["error"] is None]
+        added, duplicates, skipped = store.save(frames, module.__name__, args.account or "", path=args.store)
+        print(f"Stored {added} new row(s) in {args.store}; {duplicates} already stored, "
+              f"{skipped} without a date or balance skipped", file=sys.stderr)
+        combined = store.query(module.__name__, args.account, path=args.store)
+    export.write(combined, args.output, bank=None if args.store else module.__name__)
+    summarize(results, time.perf_counter() - started)
+    print(f"Wrote {len(combined)} rows to {args.output}", file=sys.stderr)
+
+    return 1 if any(r["error"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
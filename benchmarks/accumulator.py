@@ -0,0 +1,100 @@
+# benchmarks/accumulator.py – Per-row dicts vs the shared TransactionBuffer
+#
+# Usage (from the repository root):
+#   python benchmarks/accumulator.py [--rows 100000] [--per-file 200]
+#
+# "dicts" builds a seven-key dict per transaction (Rak_Bank's old shape) and one
+# DataFrame per file; "concat" additionally grows the result with pd.concat
+# inside the file loop (adib_bank's old run()); "buffer" appends row tuples to a
+# TransactionBuffer and materializes one frame. Time is measured on a plain run
+# and peak memory on a second run under tracemalloc (which slows allocation).
+
+import argparse
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import Rak_Bank
+from transaction_buffer import TransactionBuffer
+
+columns = Rak_Bank.columns
+
+
+def synthetic_rows(rows, seed=11):
+    rng = random.Random(seed)
+    balance = 50000.0
+    data = []
+    for i in range(rows):
+        amount = float(rng.randint(1, 500000)) / 100
+        balance += amount if i % 3 else -amount
+        withdrawal, deposit = (None, amount) if i % 3 else (amount, None)
+        data.append((f"statement_{i // 1000}.pdf", f"{1 + i % 28:02d}-Jan-2024",
+                     f"POS PURCHASE MERCHANT {i % 977} CARD ENDING {i % 10000:04d}",
+                     None, withdrawal, deposit, round(balance, 2)))
+    return data
+
+
+def dicts(data, per_file):
+    frames = []
+    for start in range(0, len(data), per_file):
+        transactions = [dict(zip(columns, row)) for row in data[start:start + per_file]]
+        frames.append(pd.DataFrame(transactions, columns=columns))
+    return pd.concat(frames, ignore_index=True)
+
+
+def concat(data, per_file):
+    combined = pd.DataFrame()
+    for start in range(0, len(data), per_file):
+        transactions = [dict(zip(columns, row)) for row in data[start:start + per_file]]
+        combined = pd.concat([combined, pd.DataFrame(transactions, columns=columns)], ignore_index=True)
+    return combined
+
+
+def buffer(data, per_file):
+    rows = TransactionBuffer(columns)
+    for start in range(0, len(data), per_file):
+        rows.extend(data[start:start + per_file])
+    return rows.to_frame()
+
+
+def measure(fn, data, per_file):
+    started = time.perf_counter()
+    df = fn(data, per_file)
+    elapsed = time.perf_counter() - started
+
+    tracemalloc.start()
+    fn(data, per_file)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return df, elapsed, peak
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark transaction accumulation strategies.")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--per-file", type=int, default=200, help="transactions per simulated PDF")
+    args = parser.parse_args(argv)
+
+    data = synthetic_rows(args.rows)
+
+    results = {}
+    for name, fn in [("dicts", dicts), ("concat", concat), ("buffer", buffer)]:
+        results[name] = measure(fn, data, args.per_file)
+
+    expected = results["buffer"][0]
+    for name in ("dicts", "concat"):
+        pd.testing.assert_frame_equal(results[name][0], expected, check_dtype=False)
+
+    print(f"{args.rows} transactions in files of {args.per_file} — results identical")
+    for name, (_, elapsed, peak) in results.items():
+        print(f"{name:7}: {elapsed:8.3f}s  ({args.rows / elapsed:,.0f} rows/s)  peak {peak / 2**20:7.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+# benchmarks/cold_start.py – Measure App.py's import cost at container start
+#
+# Usage (from the repository root):
+#   python benchmarks/cold_start.py [--repeat 7]
+#
+# Each scenario runs in a fresh interpreter so nothing is already cached in
+# sys.modules. "eager" reproduces the old App.py, which imported every bank
+# module up front; "lazy" is what App.py imports now before first paint; the
+# "first selection" rows add the one module a session actually uses.
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+BANK_MODULES = [
+    "Rak_Bank", "al_jazira_bank", "emirates_islamic_bank", "fab_bank",
+    "Wio_bank", "adib_bank", "mashreq", "adcb",
+]
+
+SCENARIOS = {
+    "eager (all bank modules)": ["streamlit"] + BANK_MODULES,
+    "lazy (registry only)": ["streamlit", "bank_registry"],
+    "lazy + first selection (fab_bank)": ["streamlit", "bank_registry", "fab_bank"],
+    "lazy + first selection (adcb)": ["streamlit", "bank_registry", "adcb"],
+}
+
+PROBE = """
+import time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+print((time.perf_counter() - start) * 1000)
+"""
+
+
+def measure(modules, repeat):
+    timings = []
+    for _ in range(repeat):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(modules=modules)],
+            cwd=ROOT, capture_output=True, text=True, check=True
+        )
+        timings.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(timings)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold-start import time of App.py.")
+    parser.add_argument("--repeat", type=int, default=7, help="Fresh interpreters per scenario")
+    args = parser.parse_args(argv)
+
+    print(f"{'scenario':<38} {'median import ms':>16}")
+    for name, modules in SCENARIOS.items():
+        print(f"{name:<38} {measure(modules, args.repeat):>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
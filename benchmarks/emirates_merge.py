@@ -0,0 +1,95 @@
+# benchmarks/emirates_merge.py – iterrows() vs run-id reduction row merging for Emirates Islamic
+#
+# Usage (from the repository root):
+#   python benchmarks/emirates_merge.py [--rows 100000]
+#
+# "iterrows" is the previous merge loop; "run-id" is emirates_islamic_bank.combine.
+# Both are checked to produce identical frames, including index and ordering.
+
+import argparse
+import os
+import random
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import emirates_islamic_bank
+
+
+def iterrows_combine(frames):
+    df_combined = pd.concat(frames, ignore_index=True)
+    df_combined = df_combined[df_combined["Transaction Date"] != "Transaction Date"]
+    df_combined["Account Balance"] = df_combined["Account Balance"].astype(str)
+    df_combined["Transaction Date"] = pd.to_datetime(df_combined["Transaction Date"], format="%d-%m-%Y", errors='coerce')
+    df_combined = df_combined.dropna(subset=["Transaction Date"])
+
+    merged_data = []
+    prev_row = None
+
+    for _, row in df_combined.iterrows():
+        if prev_row is not None and row["Account Balance"] == prev_row["Account Balance"]:
+            prev_row["Narration"] += " " + row["Narration"]
+            prev_row["Debit"] = max(prev_row["Debit"], row["Debit"])
+            prev_row["Credit"] = max(prev_row["Credit"], row["Credit"])
+        else:
+            if prev_row is not None:
+                merged_data.append(prev_row)
+            prev_row = row.copy()
+
+    if prev_row is not None:
+        merged_data.append(prev_row)
+
+    df_final = pd.DataFrame(merged_data)
+    df_final = df_final.sort_values(by="Transaction Date", ascending=True)
+    return df_final.drop_duplicates(subset=["Account Balance"], keep="first")
+
+
+def synthetic_rows(rows, seed=11):
+    rng = random.Random(seed)
+    data = []
+    balance = 50000.0
+    i = 0
+    while len(data) < rows:
+        balance += rng.choice([-1, 1]) * rng.randint(1, 5000)
+        day = 1 + (i // 40) % 28
+        month = 1 + (i // 1120) % 12
+        date = f"{day:02d}-{month:02d}-2024"
+        debit = float(rng.randint(0, 900)) if rng.random() < 0.5 else 0.0
+        credit = 0.0 if debit else float(rng.randint(0, 900))
+        for part in range(rng.choice([1, 1, 1, 2, 3])):  # wrapped narrations repeat the balance
+            data.append([date, f"NARRATION {i} PART {part}", debit if part == 0 else 0.0,
+                         credit if part == 0 else 0.0, f"{balance:,.2f}"])
+        if rng.random() < 0.01:
+            data.append(["Transaction Date", "Narration", 0.0, 0.0, "Running Balance"])
+        i += 1
+    return [pd.DataFrame(data[:rows], columns=emirates_islamic_bank.columns)]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark Emirates Islamic row merging.")
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args(argv)
+
+    frames = synthetic_rows(args.rows)
+
+    started = time.perf_counter()
+    old = iterrows_combine([f.copy() for f in frames])
+    old_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    new = emirates_islamic_bank.combine([f.copy() for f in frames])
+    new_s = time.perf_counter() - started
+
+    pd.testing.assert_frame_equal(old, new, check_dtype=False)
+
+    print(f"{args.rows} rows → {len(new)} merged transactions — results identical")
+    print(f"iterrows : {old_s:8.3f}s  ({args.rows / old_s:,.0f} rows/s)")
+    print(f"run-id   : {new_s:8.3f}s  ({args.rows / new_s:,.0f} rows/s)")
+    print(f"speedup  : {old_s / new_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
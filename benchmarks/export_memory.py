@@ -0,0 +1,66 @@
+# benchmarks/export_memory.py – Peak memory of building the download file
+#
+# Usage (from the repository root):
+#   python benchmarks/export_memory.py [--rows 500000]
+#
+# "eager csv" is what every run() used to do on each rerun
+# (df.to_csv(...).encode("utf-8")); the others are export.file_bytes() per
+# format, what download_button() hands Streamlit. Peak is tracemalloc's, on
+# top of the frame itself.
+
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import export
+
+
+def synthetic_frame(rows, seed=3):
+    rng = np.random.default_rng(seed)
+    dates = pd.Timestamp("2024-01-01") + pd.to_timedelta(rng.integers(0, 365, rows), unit="D")
+    return pd.DataFrame({
+        "Date": dates.strftime("%d %b %Y"),
+        "Description": [f"POS PURCHASE MERCHANT {i % 5000} DUBAI AE" for i in range(rows)],
+        "Amount": rng.integers(100, 500000, rows) / 100,
+        "Balance": rng.integers(100, 90000000, rows) / 100,
+        "Source File": [f"statement_{i % 12:02d}.pdf" for i in range(rows)],
+    })
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    result = fn()
+    seconds = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    size = len(result) if isinstance(result, bytes) else result.seek(0, os.SEEK_END)
+    return seconds, peak, size
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure export memory per format.")
+    parser.add_argument("--rows", type=int, default=500000)
+    args = parser.parse_args(argv)
+
+    df = synthetic_frame(args.rows)
+    scenarios = {"eager csv": lambda: df.to_csv(index=False).encode("utf-8")}
+    for fmt in export.available_formats():
+        scenarios[f"spooled {fmt}"] = lambda fmt=fmt: export.file_bytes(df, fmt)
+
+    print(f"{args.rows} rows")
+    print(f"{'scenario':<20} {'seconds':>8} {'peak MiB':>9} {'file MiB':>9}")
+    for name, fn in scenarios.items():
+        seconds, peak, size = measure(fn)
+        print(f"{name:<20} {seconds:>8.2f} {peak / 2**20:>9.1f} {size / 2**20:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
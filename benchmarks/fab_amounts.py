@@ -0,0 +1,98 @@
+# benchmarks/fab_amounts.py – Row-wise vs columnar Amount/Balance extraction for FAB
+#
+# Usage (from the repository root):
+#   python benchmarks/fab_amounts.py [--rows 50000]
+#
+# "row-wise" is the previous implementation (Series.apply calling re.findall
+# and building a pd.Series per row); "columnar" is fab_bank.to_frame's path.
+# Both are checked to produce the same Amount/Balance values.
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fab_bank
+
+
+def rowwise_amount_balance(description):
+    matches = re.findall(r'(?<!\d)(-?\d{1,3}(?:,\d{3})*\.\d{2})(?!\s*%)', description)
+    if len(matches) >= 2:
+        amount = matches[0].replace(',', '')
+        balance = matches[1].replace(',', '')
+    elif len(matches) == 1:
+        amount = matches[0].replace(',', '')
+        balance = ''
+    else:
+        amount = balance = ''
+    return pd.Series([amount, balance])
+
+
+def rowwise(df):
+    df = df.copy()
+    df['Description_clean'] = df['Description'].str.replace(r'\s+', ' ', regex=True).str.strip().str.lower()
+    df = df[~df['Description_clean'].str.contains("date value date description debit credit balance")]
+    df.drop(columns=['Description_clean'], inplace=True)
+    df[['Amount', 'Balance']] = df['Description'].apply(rowwise_amount_balance)
+    return df
+
+
+def columnar(df):
+    df = df[~df['Description'].str.contains(fab_bank.header_row_pattern)].copy()
+    df['Amount'], df['Balance'] = fab_bank.extract_amounts_balances(df['Description'])
+    return df
+
+
+def synthetic_descriptions(rows, seed=7):
+    rng = random.Random(seed)
+    out = []
+    for i in range(rows):
+        kind = rng.random()
+        if kind < 0.01:
+            out.append("Date  Value Date Description Debit Credit Balance")
+        elif kind < 0.05:
+            out.append(f"PROFIT RATE 2.50 % MONTHLY {rng.randint(1, 999):,}.{rng.randint(0, 99):02d}")
+        elif kind < 0.08:
+            out.append(f"CHARGES REVERSAL REF {rng.randint(10**7, 10**8)}")
+        else:
+            amount = f"{rng.randint(1, 250000):,}.{rng.randint(0, 99):02d}"
+            balance = f"{rng.randint(1, 9000000):,}.{rng.randint(0, 99):02d}"
+            out.append(f"POS PURCHASE CARD NO 4xxx{i % 10000:04d} MERCHANT {i} {amount} {balance} AED")
+    return pd.DataFrame({"Description": out})
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark FAB Amount/Balance extraction.")
+    parser.add_argument("--rows", type=int, default=50000)
+    args = parser.parse_args(argv)
+
+    df = synthetic_descriptions(args.rows)
+
+    started = time.perf_counter()
+    old = rowwise(df)
+    old_s = time.perf_counter() - started
+
+    started = time.perf_counter()
+    new = columnar(df)
+    new_s = time.perf_counter() - started
+
+    for col in ["Amount", "Balance"]:
+        expected = pd.to_numeric(old[col], errors="coerce").to_numpy()
+        assert old.index.equals(new.index), "header filtering differs"
+        assert np.array_equal(expected, new[col].to_numpy(), equal_nan=True), f"{col} differs"
+
+    print(f"{len(df)} rows, {len(new)} after header filtering — results identical")
+    print(f"row-wise : {old_s:8.3f}s  ({len(df) / old_s:,.0f} rows/s)")
+    print(f"columnar : {new_s:8.3f}s  ({len(df) / new_s:,.0f} rows/s)")
+    print(f"speedup  : {old_s / new_s:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# benchmarks/line_classifier.py – Per-bank line filtering: phrase loops vs LineClassifier
+#
+# Usage (from the repository root):
+#   python benchmarks/line_classifier.py [--lines 200000]
+#
+# "loop" is the previous per-line code (any(phrase in line ...) followed by a
+# separate start regex); "classifier" is the bank's line_classifier. Both are
+# checked to label every synthetic line the same way (noise / start / body).
+
+import argparse
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fab_bank
+import mashreq
+import Rak_Bank
+from line_classifier import NOISE, START
+
+
+# ==== Previous per-line code ====
+def fab_loop(line):
+    if any(phrase in line for phrase in fab_bank.unwanted_phrases):
+        return NOISE
+    clean = re.sub(r'\s+', ' ', line.strip())
+    if re.match(r"^\d{1,2} \w{3} \d{4}\s+\d{1,2} \w{3} \d{4}", clean) is not None:
+        return START
+    return None
+
+
+def mashreq_loop(line):
+    if any(phrase in line for phrase in mashreq.unwanted_phrases) or mashreq.of_pattern.search(line):
+        return NOISE
+    if mashreq.date_pattern.search(line):
+        return START
+    return None
+
+
+def rak_loop(line):
+    line_lower = line.lower()
+    if any(keyword in line_lower for keyword in [
+        "page", "date issued", "your current account transactions",
+        "account type: current account", "الإصدار", "مدة الكشف"
+    ]):
+        return NOISE
+    if Rak_Bank.date_pattern.match(line):
+        return START
+    return None
+
+
+def classifier_kind(classifier):
+    def kind(line):
+        kind, _ = classifier.classify(line)
+        return kind if kind in (NOISE, START) else None
+    return kind
+
+
+# ==== Synthetic lines ====
+def money(rng):
+    return f"{rng.randint(1, 250000):,}.{rng.randint(0, 99):02d}"
+
+
+def fab_lines(rng, n):
+    noise = fab_bank.unwanted_phrases
+    out = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.1:
+            out.append(f"  {rng.choice(noise)} {rng.randint(1, 99)}")
+        elif kind < 0.45:
+            out.append(f"0{i % 9 + 1} Jan 2024  0{i % 9 + 1}  Jan 2024 POS PURCHASE CARD {i} {money(rng)} {money(rng)}")
+        else:
+            out.append(f"   MERCHANT {i} DUBAI AE REF {rng.randint(10**7, 10**8)}")
+    return out
+
+
+def mashreq_lines(rng, n):
+    noise = mashreq.unwanted_phrases
+    out = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.1:
+            out.append(rng.choice(noise))
+        elif kind < 0.15:
+            out.append(f"{rng.randint(1, 8)} of {rng.randint(8, 20)}")
+        elif kind < 0.5:
+            out.append(f"2024-0{i % 9 + 1}-1{i % 10} Card purchase REF{i} {money(rng)} {money(rng)}")
+        else:
+            out.append(f"NOON.COM DUBAI ARE {rng.randint(10**5, 10**6)}")
+    return out
+
+
+def rak_lines(rng, n):
+    noise = ["Page 1 of 3", "Date Issued: 01-Jan-2024", "YOUR CURRENT ACCOUNT TRANSACTIONS", "مدة الكشف"]
+    out = []
+    for i in range(n):
+        kind = rng.random()
+        if kind < 0.1:
+            out.append(rng.choice(noise))
+        elif kind < 0.45:
+            out.append(f"{i % 28 + 1:02d}-Jan-2024 FUNDS TRANSFER {i}")
+        else:
+            out.append(f"{money(rng)} {money(rng)} Cr.")
+    return out
+
+
+BANKS = {
+    "fab_bank": (fab_lines, fab_loop, fab_bank.line_classifier),
+    "mashreq": (mashreq_lines, mashreq_loop, mashreq.line_classifier),
+    "Rak_Bank": (rak_lines, rak_loop, Rak_Bank.line_classifier),
+}
+
+
+def time_kinds(kind_fn, lines):
+    started = time.perf_counter()
+    kinds = [kind_fn(line) for line in lines]
+    return kinds, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-bank line classification.")
+    parser.add_argument("--lines", type=int, default=200000)
+    args = parser.parse_args(argv)
+
+    print(f"{'bank':<10} {'loop lines/s':>14} {'classifier lines/s':>20} {'speedup':>8}")
+    for bank, (generate, loop, classifier) in BANKS.items():
+        lines = generate(random.Random(11), args.lines)
+        old, old_s = time_kinds(loop, lines)
+        new, new_s = time_kinds(classifier_kind(classifier), lines)
+        assert old == new, f"{bank}: classifications differ"
+        print(f"{bank:<10} {len(lines) / old_s:>14,.0f} {len(lines) / new_s:>20,.0f} {old_s / new_s:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
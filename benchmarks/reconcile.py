@@ -0,0 +1,79 @@
+# benchmarks/reconcile.py – Running-balance check throughput and break detection
+#
+# Usage (from the repository root):
+#   python benchmarks/reconcile.py [--rows 1000000] [--breaks 25]
+#
+# Builds a ledger of --rows transactions, moves --breaks of its balances by
+# 10.00, and times reconcile.check() on it as numeric columns and as the
+# thousands-separated strings the table parsers produce, oldest first and
+# newest first. Every injected break must be found (a moved balance
+# breaks its own row and the next one); the exit status is 1 otherwise.
+
+import argparse
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repository root comes first: benchmark scripts share names with its modules
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+import numpy as np
+import pandas as pd
+
+import reconcile
+
+FIELDS = {"debit": "Debit", "credit": "Credit", "balance": "Balance"}
+
+
+def ledger(rows, breaks, seed=1):
+    """Debit/credit/balance frame with `breaks` balances moved, and the 1-based rows they break."""
+    rng = np.random.default_rng(seed)
+    amount = np.round(rng.uniform(1, 5000, rows), 2)
+    credit = rng.random(rows) < 0.3
+    balance = np.round(50000 + np.cumsum(np.where(credit, amount, -amount)), 2)
+    moved = np.sort(rng.choice(np.arange(1, rows - 1, 3), breaks, replace=False))
+    balance[moved] += 10.0
+    df = pd.DataFrame({"Debit": np.where(credit, 0.0, amount), "Credit": np.where(credit, amount, 0.0),
+                       "Balance": balance})
+    return df, sorted(set(moved + 1) | set(moved + 2))
+
+
+def as_strings(df):
+    return df.assign(**{column: df[column].map("{:,.2f}".format).astype("str") for column in df})
+
+
+def newest_first(df, expected, rows):
+    # Reversed, each moved balance breaks the rows before and at it instead
+    return df.iloc[::-1].reset_index(drop=True), sorted(rows + 1 - row for row in expected)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark reconcile.check() and verify it finds every break.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Transactions in the ledger")
+    parser.add_argument("--breaks", type=int, default=25, help="Balances moved off the running total")
+    args = parser.parse_args(argv)
+
+    df, expected = ledger(args.rows, args.breaks)
+    cases = [("numeric", df, expected), ("strings", as_strings(df), expected)]
+    cases += [(f"{name}, newest first", *newest_first(frame, rows, args.rows)) for name, frame, rows in cases]
+
+    failed = []
+    print(f"{'columns':<24} {'rows':>9} {'seconds':>8} {'rows/s':>12} {'breaks':>7}  status")
+    for name, frame, rows in cases:
+        started = time.perf_counter()
+        result = reconcile.check(frame, FIELDS)
+        seconds = time.perf_counter() - started
+        found = sorted(result.breaks["Row"].tolist())
+        status = "ok" if found == rows else f"MISSED {sorted(set(rows) - set(found))[:5]}, EXTRA {sorted(set(found) - set(rows))[:5]}"
+        if found != rows:
+            failed.append(name)
+        print(f"{name:<24} {len(frame):>9,} {seconds:>8.3f} {len(frame) / seconds:>12,.0f} {len(found):>7}  {status}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
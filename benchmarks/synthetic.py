@@ -0,0 +1,281 @@
+# benchmarks/synthetic.py – Synthetic statement PDFs in each bank module's layout
+#
+# Usage (from the repository root):
+#   python benchmarks/synthetic.py fab_bank --pages 50 -o fab_50.pdf
+#
+# make_statement(bank, pages) returns PDF bytes built with PyMuPDF. Text
+# layouts (FAB, Rak, Mashreq, ADIB, Wio) are plain text lines in the order
+# each parser reads them; table layouts (ADCB, Emirates Islamic, Al Jazira)
+# are ruled grids so pdfplumber's table detection finds them. Content is
+# seeded, so the same arguments always give the same file. filler_pages adds
+# that many pages without transactions, a cover page first and terms and
+# conditions after the last transaction, as real statements have.
+
+import argparse
+import random
+from datetime import date, timedelta
+
+import fitz  # PyMuPDF
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+MARGIN = 36
+FONT_SIZE = 7
+LINE_HEIGHT = 9
+ROW_HEIGHT = 22
+TABLE_ROWS_PER_PAGE = 30
+
+
+# ==== Values ====
+class Ledger:
+    """Running balance and dates for consecutive synthetic transactions."""
+
+    def __init__(self, seed=1):
+        self.rng = random.Random(seed)
+        self.day = date(2024, 1, 1)
+        self.balance = 50000.0
+        self.count = 0
+
+    def next(self):
+        self.count += 1
+        if self.count % 3 == 0:
+            self.day += timedelta(days=1)
+        amount = round(self.rng.uniform(1, 5000), 2)
+        credit = self.rng.random() < 0.3
+        self.balance = round(self.balance + (amount if credit else -amount), 2)
+        return self.day, amount, credit, self.balance
+
+    def merchant(self):
+        return self.rng.choice(["CARREFOUR", "NOON.COM", "DEWA", "ETISALAT", "ENOC", "LULU HYPERMARKET"])
+
+
+def money(value):
+    return f"{value:,.2f}"
+
+
+# ==== Drawing ====
+def text_page(doc, lines):
+    # One text object per page: PyPDF2 only breaks lines on moves within it
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    page.insert_text((MARGIN, MARGIN), "\n".join(lines), fontsize=FONT_SIZE, lineheight=LINE_HEIGHT / FONT_SIZE)
+    return page
+
+
+def lines_per_page():
+    return (PAGE_HEIGHT - 2 * MARGIN) // LINE_HEIGHT
+
+
+def table_page(doc, widths, rows, title=None):
+    page = doc.new_page(width=PAGE_WIDTH, height=PAGE_HEIGHT)
+    top = MARGIN
+    if title:
+        page.insert_text((MARGIN, top), title, fontsize=FONT_SIZE + 2)
+        top += 2 * LINE_HEIGHT
+
+    xs = [MARGIN]
+    for width in widths:
+        xs.append(xs[-1] + width)
+    ys = [top + i * ROW_HEIGHT for i in range(len(rows) + 1)]
+
+    for y in ys:
+        page.draw_line((xs[0], y), (xs[-1], y), width=0.5)
+    for x in xs:
+        page.draw_line((x, ys[0]), (x, ys[-1]), width=0.5)
+
+    for r, row in enumerate(rows):
+        for c, cell in enumerate(row):
+            for k, part in enumerate(str(cell).split("\n")):
+                page.insert_text((xs[c] + 2, ys[r] + 8 + k * LINE_HEIGHT), part, fontsize=FONT_SIZE)
+    return page
+
+
+def paged_text(doc, header, body_lines):
+    per_page = lines_per_page() - len(header)
+    for start in range(0, len(body_lines), per_page):
+        text_page(doc, header + body_lines[start:start + per_page])
+
+
+def row_count(pages, per_page):
+    return pages * per_page
+
+
+FILLER_TEXT = [
+    "Please examine this statement carefully and report any discrepancy within 15 days,",
+    "failing which the statement will be considered correct. Terms and conditions apply.",
+    "Deposits are subject to the account terms published on the bank's website.",
+    "Foreign currency transactions are converted at the rate applicable on the posting day.",
+]
+
+
+def filler_page(doc, title):
+    lines = [title, ""]
+    while len(lines) < lines_per_page():
+        lines.extend(FILLER_TEXT)
+    text_page(doc, lines[:lines_per_page()])
+
+
+# ==== Layouts ====
+def fab_bank(doc, pages, ledger):
+    header = [
+        "First Abu Dhabi Bank PJSC",
+        "Account Statement FROM 01 Jan 2024 TO 31 Dec 2024",
+        "Date Value Date Description Debit Credit Balance",
+    ]
+    body = []
+    for _ in range(row_count(pages, (lines_per_page() - len(header)) // 2)):
+        day, amount, _, balance = ledger.next()
+        d = day.strftime("%d %b %Y")
+        body.append(f"{d} {d} POS PURCHASE {ledger.merchant()} {money(amount)} {money(balance)}")
+        body.append(f"CARD NO 4xxx{ledger.count % 10000:04d} DUBAI AE")
+    paged_text(doc, header, body)
+
+
+def Rak_Bank(doc, pages, ledger):
+    header = [
+        "RAKBANK",
+        "Your Current Account Transactions",
+        "Date Description Cheque Withdrawal Deposit Balance",
+    ]
+    body = []
+    for _ in range(row_count(pages, (lines_per_page() - len(header)) // 2)):
+        day, amount, credit, balance = ledger.next()
+        kind = "FUNDS TRANSFER FROM" if credit else "CARD PURCHASE"
+        body.append(f"{day.strftime('%d-%b-%Y')} {kind} {ledger.merchant()}")
+        body.append(f"{money(amount)} {money(balance)} Cr.")
+    paged_text(doc, header, body)
+
+
+def mashreq(doc, pages, ledger):
+    header = ["Date Transaction Reference Number Debit Balance Credit"]
+    body = []
+    for _ in range(row_count(pages, (lines_per_page() - len(header) - 1) // 2)):
+        day, amount, _, balance = ledger.next()
+        body.append(f"{day.isoformat()} Card purchase {ledger.merchant()} REF{ledger.count:08d} {money(amount)} {money(balance)}")
+        body.append("DUBAI ARE")
+    per_page = lines_per_page() - len(header) - 1
+    for page_no, start in enumerate(range(0, len(body), per_page), 1):
+        text_page(doc, header + body[start:start + per_page] + [f"{page_no} of {pages}"])
+
+
+def adib_bank(doc, pages, ledger):
+    header = ["Transaction Date", "Value Date", "Narrative", "Transaction Reference", "Debit", "Credit", "Running Balance"]
+    body = []
+    for _ in range(row_count(pages, lines_per_page() - len(header)) // 8):
+        day, amount, credit, balance = ledger.next()
+        d = day.strftime("%d-%m-%Y")
+        body += [
+            d, d, f"PURCHASE {ledger.merchant()}", "DUBAI AE",
+            f"FT{ledger.count:010d}", "0.00" if credit else money(amount),
+            money(amount) if credit else "0.00", money(balance),
+        ]
+    paged_text(doc, header, body)
+
+
+def Wio_bank(doc, pages, ledger):
+    header = "Date Ref. Number Description Amount (Incl. VAT) Balance"
+    per_page = lines_per_page() - 4
+    rows = []
+    for _ in range(row_count(pages, per_page)):
+        day, amount, credit, balance = ledger.next()
+        signed = amount if credit else -amount
+        rows.append(f"{day.strftime('%d/%m/%Y')} P{ledger.count:09d} {ledger.merchant()} DUBAI {signed:,.2f} {money(balance)}")
+
+    # Two accounts, each opening with the block marker, account line and header row
+    accounts = [("1000000001", "Current AED"), ("1000000002", "Savings USD")]
+    half = len(rows) // 2
+    for (account, kind), block in zip(accounts, [rows[:half], rows[half:]]):
+        preamble = [
+            "ACCOUNT STATEMENT ACCOUNT HOLDER NAME ACCOUNT TYPE CURRENCY",
+            f"SYNTHETIC HOLDER {kind} {account}",
+        ]
+        for start in range(0, len(block), per_page):
+            lines = (preamble if start == 0 else []) + [header] + block[start:start + per_page]
+            text_page(doc, lines)
+
+
+def adcb(doc, pages, ledger):
+    headers = ["Posting Date", "Value Date", "Description", "Ref/Cheque No", "Debit Amount", "Credit Amount", "Balance"]
+    widths = [62, 62, 150, 70, 62, 62, 55]
+    for page_no in range(pages):
+        rows = [headers]
+        for _ in range(TABLE_ROWS_PER_PAGE - 1):
+            day, amount, credit, balance = ledger.next()
+            d = day.strftime("%d/%m/%Y")
+            rows.append([
+                d, d, f"{ledger.merchant()}\nDUBAI AE", f"{ledger.count:08d}",
+                "" if credit else money(amount), money(amount) if credit else "", money(balance),
+            ])
+        table_page(doc, widths, rows, title="Abu Dhabi Commercial Bank" if page_no == 0 else None)
+
+
+def emirates_islamic_bank(doc, pages, ledger):
+    headers = ["Transaction Date", "Value Date", "Narration", "Debit", "Credit", "Running Balance"]
+    widths = [70, 70, 180, 70, 70, 63]
+    for page_no in range(pages):
+        rows = [headers]
+        for _ in range(TABLE_ROWS_PER_PAGE - 1):
+            day, amount, credit, balance = ledger.next()
+            d = day.strftime("%d-%m-%Y")
+            rows.append([
+                d, d, f"PURCHASE {ledger.merchant()}",
+                "0.00" if credit else money(amount), money(amount) if credit else "0.00", money(balance),
+            ])
+        table_page(doc, widths, rows, title="Emirates Islamic" if page_no == 0 else None)
+
+
+def al_jazira_bank(doc, pages, ledger):
+    headers = ["Transaction Date", "Value Date", "Description", "Withdrawal (Dr)", "Deposit (Cr)", "Running Balance"]
+    widths = [70, 70, 180, 70, 70, 63]
+    for page_no in range(pages):
+        rows = [headers]
+        for _ in range(TABLE_ROWS_PER_PAGE - 1):
+            day, amount, credit, balance = ledger.next()
+            d = day.strftime("%d/%m/%Y")
+            rows.append([
+                d, d, f"TRANSFER {ledger.merchant()}",
+                "" if credit else money(amount), money(amount) if credit else "", money(balance),
+            ])
+        table_page(doc, widths, rows, title="Al Jazira" if page_no == 0 else None)
+
+
+LAYOUTS = {
+    "fab_bank": fab_bank,
+    "Rak_Bank": Rak_Bank,
+    "mashreq": mashreq,
+    "adib_bank": adib_bank,
+    "Wio_bank": Wio_bank,
+    "adcb": adcb,
+    "emirates_islamic_bank": emirates_islamic_bank,
+    "al_jazira_bank": al_jazira_bank,
+}
+
+
+def make_statement(bank, pages, seed=1, filler_pages=0):
+    """Return the bytes of a synthetic statement of about `pages` pages for bank."""
+    doc = fitz.open()
+    if filler_pages:
+        filler_page(doc, "Account Statement - Customer Copy")
+    LAYOUTS[bank](doc, pages, Ledger(seed))
+    for _ in range(filler_pages - 1):
+        filler_page(doc, "Terms and Conditions")
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Write a synthetic statement PDF for a bank module.")
+    parser.add_argument("bank", choices=sorted(LAYOUTS))
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--filler-pages", type=int, default=0, help="Cover and T&C pages without transactions")
+    parser.add_argument("-o", "--output", default=None, help="Output path (default: <bank>_<pages>p.pdf)")
+    args = parser.parse_args(argv)
+
+    path = args.output or f"{args.bank}_{args.pages}p.pdf"
+    with open(path, "wb") as fh:
+        fh.write(make_statement(args.bank, args.pages, args.seed, args.filler_pages))
+    print(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+# benchmarks/text_backends.py – Text backend speed and output equivalence per bank
+#
+# Usage (from the repository root):
+#   python benchmarks/text_backends.py [--pages 40] [--bank fab_bank ...]
+#   python benchmarks/text_backends.py --pdf fab_bank=statement.pdf --pdf Wio_bank=wio.pdf
+#
+# Every text-based bank module reads its pages through page_text.py with a
+# selectable backend. For each bank this parses the same statement with every
+# backend in page_text.BACKENDS and reports pages/s, then checks the parsed
+# frame against the golden output: the one from the backend the bank used
+# before page_text.py existed (LEGACY below). A backend whose frame differs in
+# any column or row is reported with the first differing row, and the exit
+# status is 1. Synthetic statements (benchmarks/synthetic.py) are used unless
+# --pdf gives real ones; check real statements before changing a default.
+# Synthetic pages are written as one text object each, so every backend splits
+# their lines alike: they measure speed but cannot show layout differences.
+
+import argparse
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repository root comes first: benchmark scripts share names with its modules
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+import importlib
+
+import page_text
+from synthetic import make_statement
+
+# The backend each bank's parser was written against; its output is the golden one
+LEGACY = {
+    "fab_bank": "pypdf2",
+    "Rak_Bank": "pymupdf",
+    "mashreq": "pypdf2",
+    "adib_bank": "pymupdf",
+    "Wio_bank": "pdfplumber",
+}
+
+
+# ==== Measurement ====
+def page_count(data):
+    import fitz  # PyMuPDF
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def parse(module, data, name, backend, min_seconds):
+    """Parse data with backend for at least min_seconds; returns (frame, fastest seconds)."""
+    seconds = float("inf")
+    deadline = time.perf_counter() + min_seconds
+    while seconds == float("inf") or time.perf_counter() < deadline:
+        started = time.perf_counter()
+        df = module.parse_file(io.BytesIO(data), name, backend=backend)
+        seconds = min(seconds, time.perf_counter() - started)
+    return df, seconds
+
+
+def first_difference(golden, df):
+    """Describe the first difference between two parsed frames, or None when they are equal."""
+    if list(golden.columns) != list(df.columns):
+        return f"columns {list(golden.columns)} != {list(df.columns)}"
+    if len(golden) != len(df):
+        return f"{len(golden)} rows != {len(df)} rows"
+    golden, df = golden.reset_index(drop=True), df.reset_index(drop=True)
+    for column in golden.columns:
+        same = (golden[column] == df[column]) | (golden[column].isna() & df[column].isna())
+        if not same.all():
+            row = int((~same).idxmax())
+            return f"row {row} {column}: {golden[column][row]!r} != {df[column][row]!r}"
+    return None
+
+
+def compare(bank, data, name, min_seconds):
+    module = importlib.import_module(bank)
+    pages = page_count(data)
+    results = {}
+    for backend in page_text.BACKENDS:
+        results[backend] = parse(module, data, name, backend, min_seconds)
+    golden = results[LEGACY[bank]][0]
+
+    failed = False
+    for backend, (df, seconds) in results.items():
+        difference = first_difference(golden, df)
+        if backend == LEGACY[bank]:
+            status = "golden"
+        elif difference is None:
+            status = "same output"
+        else:
+            status = "DIFFERS: " + difference
+            failed = True
+        default = "*" if backend == module.text_backend else " "
+        print(f"{bank:<12} {name[-24:]:<24} {backend:<10}{default} {pages:>5} {len(df):>6} "
+              f"{pages / seconds:>9.1f}  {status}")
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare page text backends per bank for speed and identical output.")
+    parser.add_argument("--pages", type=int, default=40, help="Pages per synthetic statement")
+    parser.add_argument("--bank", action="append", choices=sorted(LEGACY), help="Bank module (repeatable; default: all)")
+    parser.add_argument("--pdf", action="append", default=[], metavar="BANK=PATH",
+                        help="Compare a real statement instead of synthetic ones (repeatable)")
+    parser.add_argument("--min-seconds", type=float, default=0.5, help="Minimum parse time per backend")
+    args = parser.parse_args(argv)
+
+    inputs = []
+    for spec in args.pdf:
+        bank, _, path = spec.partition("=")
+        if bank not in LEGACY or not path:
+            parser.error(f"--pdf expects BANK=PATH with BANK one of {', '.join(sorted(LEGACY))}")
+        with open(path, "rb") as fh:
+            inputs.append((bank, fh.read(), os.path.basename(path)))
+    if not inputs:
+        inputs = [(bank, make_statement(bank, args.pages), f"synthetic_{bank}.pdf") for bank in args.bank or LEGACY]
+
+    print(f"{'bank':<12} {'file':<24} {'backend':<11} {'pages':>5} {'rows':>6} {'pages/s':>9}  status  (* default)")
+    failed = [bank for bank, data, name in inputs if compare(bank, data, name, args.min_seconds)]
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+# benchmarks/throughput.py – Per-bank parser throughput with stored baselines
+#
+# Usage (from the repository root):
+#   python benchmarks/throughput.py [--pages 40] [--bank fab_bank ...]
+#   python benchmarks/throughput.py --update-baseline
+#
+# For each bank a synthetic statement (benchmarks/synthetic.py) is written to a
+# temp file and parsed headlessly through the module's parse_file in a fresh
+# interpreter, so peak RSS and import state belong to that bank alone; each
+# interpreter repeats the parse for --min-seconds and keeps the fastest.
+#
+# Absolute pages/s follows the host (CPU model, frequency scaling, other load)
+# as much as the code, so the gate does not compare it across runs. Before
+# each parse the interpreter times a reference: extracting the statement's
+# text with the PDF library the bank reads it with (its text_backend, or
+# pdfplumber for the table banks) and no repository code. A bank's score is
+# the median over all pairs of its pages/s divided by the reference's, and the
+# stored baseline holds that ratio ("vs ref"). The two halves of a pair run
+# back to back and spend their time in the same library, so a slower or busier
+# host moves both alike. A bank regresses when its ratio falls, or peak RSS
+# grows, by more than --threshold (default 25%), or its row count changes; the
+# exit status is 1 if any bank regressed. An upgrade of the PDF libraries can
+# still move the ratio, so refresh the baselines with --update-baseline after
+# one.
+#
+# Peak RSS includes page_pool's worker processes, reported as the largest
+# single process.
+
+import argparse
+import importlib
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE_PATH = os.path.join(ROOT, "benchmarks", "baselines.json")
+
+# The repository root comes first: benchmark scripts share names with its modules
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+from synthetic import LAYOUTS, make_statement
+
+PROBE = """
+import json, os, resource, statistics, sys, time
+sys.path.insert(0, {root!r})
+import importlib
+module = importlib.import_module({bank!r})
+
+def reference(path, library):
+    if library == "pymupdf":
+        import fitz
+        with fitz.open(path) as doc:
+            return [page.get_text("text") for page in doc]
+    if library == "pypdf2":
+        import PyPDF2
+        with open(path, "rb") as fh:
+            return [page.extract_text() for page in PyPDF2.PdfReader(fh).pages]
+    import pdfplumber
+    texts = []
+    with pdfplumber.open(path) as pdf:
+        for page in pdf.pages:
+            texts.append(page.extract_text())
+            page.close()  # as page_text.py does, so the reference adds nothing to peak RSS
+    return texts
+
+# Reference and parse alternate for at least min_seconds, so each pair sees the
+# same host load; the fastest of each and every pair's ratio are reported
+seconds, reference_seconds, ratios = float("inf"), float("inf"), []
+deadline = time.perf_counter() + {min_seconds!r}
+while not ratios or time.perf_counter() < deadline:
+    started = time.perf_counter()
+    reference({path!r}, {library!r})
+    parsing = time.perf_counter()
+    with open({path!r}, "rb") as fh:
+        df = module.parse_file(fh, os.path.basename({path!r}))
+    finished = time.perf_counter()
+    seconds = min(seconds, finished - parsing)
+    reference_seconds = min(reference_seconds, parsing - started)
+    ratios.append((parsing - started) / (finished - parsing))
+scale = 1 if sys.platform == "darwin" else 1024  # ru_maxrss is KiB on Linux, bytes on macOS
+peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+           resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss) * scale
+print(json.dumps({{"rows": len(df), "seconds": seconds, "reference_seconds": reference_seconds,
+                  "ratios": ratios, "peak_rss_mb": peak / 2**20}}))
+"""
+
+
+# ==== Measurement ====
+def page_count(data):
+    import fitz  # PyMuPDF
+    with fitz.open(stream=data, filetype="pdf") as doc:
+        return doc.page_count
+
+
+def reference_library(bank):
+    module = importlib.import_module(bank)
+    return getattr(module, "text_backend", None) or getattr(module, "default_backend", "pdfplumber")
+
+
+def measure(bank, pages, repeat, min_seconds):
+    data = make_statement(bank, pages)
+    library = reference_library(bank)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        tmp.write(data)
+    try:
+        runs = []
+        for _ in range(repeat):
+            out = subprocess.run(
+                [sys.executable, "-c", PROBE.format(root=ROOT, bank=bank, path=tmp.name, library=library,
+                                                    min_seconds=min_seconds)],
+                cwd=ROOT, capture_output=True, text=True, check=True
+            )
+            runs.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    finally:
+        os.remove(tmp.name)
+
+    best = min(runs, key=lambda r: r["seconds"])
+    reference_seconds = min(r["reference_seconds"] for r in runs)
+    actual_pages = page_count(data)
+    return {
+        "pages": actual_pages,
+        "rows": best["rows"],
+        "pages_per_s": round(actual_pages / best["seconds"], 2),
+        "rows_per_s": round(best["rows"] / best["seconds"], 1),
+        "reference": library,
+        "reference_pages_per_s": round(actual_pages / reference_seconds, 2),
+        "vs_reference": round(statistics.median(ratio for r in runs for ratio in r["ratios"]), 4),
+        "peak_rss_mb": round(max(r["peak_rss_mb"] for r in runs), 1),
+    }
+
+
+# ==== Baselines ====
+def load_baselines(path):
+    try:
+        with open(path, encoding="utf-8") as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def save_baselines(path, baselines):
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump(baselines, fh, indent=2, sort_keys=True)
+        fh.write("\n")
+
+
+def regressions(result, baseline, threshold):
+    found = []
+    if baseline.get("reference") != result["reference"]:
+        return [f"reference is now {result['reference']}, not {baseline.get('reference')}; "
+                "refresh the baseline with --update-baseline"]
+    if result["vs_reference"] < baseline["vs_reference"] * (1 - threshold):
+        found.append(f"vs ref {baseline['vs_reference']:.3g}x -> {result['vs_reference']:.3g}x")
+    if result["peak_rss_mb"] > baseline["peak_rss_mb"] * (1 + threshold):
+        found.append(f"peak RSS {baseline['peak_rss_mb']:.0f} -> {result['peak_rss_mb']:.0f} MiB")
+    if result["rows"] != baseline["rows"] and result["pages"] == baseline["pages"]:
+        found.append(f"rows {baseline['rows']} -> {result['rows']}")
+    return found
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark per-bank parser throughput against baselines.")
+    parser.add_argument("--pages", type=int, default=40, help="Pages per synthetic statement")
+    parser.add_argument("--bank", action="append", choices=sorted(LAYOUTS), help="Bank module (repeatable; default: all)")
+    parser.add_argument("--repeat", type=int, default=3, help="Fresh interpreters per bank; the fastest is kept")
+    parser.add_argument("--min-seconds", type=float, default=1.0, help="Minimum parse time per interpreter")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="Allowed fractional slowdown relative to the reference / RSS growth")
+    parser.add_argument("--baseline", default=BASELINE_PATH, help="Baseline JSON file")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the new baselines")
+    args = parser.parse_args(argv)
+
+    baselines = load_baselines(args.baseline)
+    failed = []
+
+    print(f"{'bank':<22} {'pages':>5} {'rows':>6} {'pages/s':>9} {'rows/s':>10} {'ref pages/s':>11} "
+          f"{'vs ref':>8} {'peak MiB':>9}  status")
+    for bank in args.bank or list(LAYOUTS):
+        result = measure(bank, args.pages, args.repeat, args.min_seconds)
+        baseline = baselines.get(bank)
+        if args.update_baseline:
+            baselines[bank] = result
+            status = "baseline stored"
+        elif baseline is None:
+            status = "no baseline"
+        else:
+            found = regressions(result, baseline, args.threshold)
+            status = "REGRESSED: " + "; ".join(found) if found else "ok"
+            if found:
+                failed.append(bank)
+        print(
+            f"{bank:<22} {result['pages']:>5} {result['rows']:>6} {result['pages_per_s']:>9.1f} "
+            f"{result['rows_per_s']:>10,.0f} {result['reference_pages_per_s']:>11.1f} "
+            f"{result['vs_reference']:>7.3g}x {result['peak_rss_mb']:>9.0f}  {status}"
+        )
+
+    if args.update_baseline:
+        save_baselines(args.baseline, baselines)
+        print(f"Baselines written to {os.path.relpath(args.baseline, ROOT)}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,73 @@
+# benchmarks/triage.py – Time saved by page triage on statements with filler pages
+#
+# Usage (from the repository root):
+#   python benchmarks/triage.py [--pages 20] [--filler-pages 6] [--bank adcb ...]
+#
+# For each bank that triages pages (page_triage.py), a synthetic statement with
+# --filler-pages cover and T&C pages is parsed with triage off and on, and the
+# pages parsed and skipped, seconds and rows of each are reported. With triage
+# on, the frame must equal the one parsed from the same statement without
+# filler pages; the exit status is 1 if it does not. (With it off, Rak reads
+# the T&C text into the last transaction.) Pages run inline
+# (page_pool.disable()) so the times compare extraction work, not workers.
+
+import argparse
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repository root comes first: benchmark scripts share names with its modules
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+import importlib
+
+import page_pool
+import page_triage
+import timing
+from synthetic import make_statement
+
+BANKS = ["adcb", "emirates_islamic_bank", "al_jazira_bank", "Rak_Bank"]
+
+
+def parse(module, data, triage):
+    """Parse data with triage on or off; returns (frame, seconds, counts)."""
+    page_triage.ENABLED = triage
+    recorder = timing.Timings(module.__name__)
+    started = time.perf_counter()
+    with timing.recording(recorder):
+        df = module.parse_file(io.BytesIO(data), "statement.pdf")
+    return df, time.perf_counter() - started, recorder.counts
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare parsing with and without page triage.")
+    parser.add_argument("--pages", type=int, default=20, help="Transaction pages per synthetic statement")
+    parser.add_argument("--filler-pages", type=int, default=6, help="Cover and T&C pages added around them")
+    parser.add_argument("--bank", action="append", choices=BANKS, help="Bank module (repeatable; default: all)")
+    args = parser.parse_args(argv)
+
+    page_pool.disable()
+    failed = []
+    print(f"{'bank':<22} {'triage':<6} {'parsed':>6} {'skipped':>7} {'seconds':>8} {'rows':>6}  status")
+    for bank in args.bank or BANKS:
+        module = importlib.import_module(bank)
+        expected, _, _ = parse(module, make_statement(bank, args.pages), True)
+        data = make_statement(bank, args.pages, filler_pages=args.filler_pages)
+        for triage in (False, True):
+            df, seconds, counts = parse(module, data, triage)
+            same = df.reset_index(drop=True).equals(expected.reset_index(drop=True))
+            if triage and not same:
+                failed.append(bank)
+            parsed = counts.get("pages_parsed", "-") if triage else "all"
+            print(f"{bank:<22} {'on' if triage else 'off':<6} {parsed:>6} {counts.get('pages_skipped', 0):>7} "
+                  f"{seconds:>8.2f} {len(df):>6}  {'ok' if same else 'DIFFERS from the statement without filler'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
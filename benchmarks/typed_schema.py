@@ -0,0 +1,93 @@
+# benchmarks/typed_schema.py – Memory and join time of typed consolidations
+#
+# Usage (from the repository root):
+#   python benchmarks/typed_schema.py [--rows 1000000] [--files 250] [--bank fab_bank ...]
+#
+# Each bank's synthetic statement is parsed once and its combined frame tiled
+# to --rows rows, as if --files statements had been consolidated (each copy
+# gets its own source file name). The frame is then converted with
+# schema.typed(), and both forms are compared by deep memory use and by the
+# time to join a 1% sample back on the bank's date and balance columns, the
+# way store.py fingerprints rows. Every amount must survive the conversion to
+# fils; the exit status is 1 if any does not.
+
+import argparse
+import io
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# The repository root comes first: benchmark scripts share names with its modules
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+sys.path.insert(0, ROOT)
+
+import importlib
+
+import numpy as np
+import pandas as pd
+
+import page_pool
+import schema
+from synthetic import make_statement
+
+BANKS = ["fab_bank", "Rak_Bank", "mashreq", "adib_bank", "Wio_bank", "adcb", "emirates_islamic_bank",
+         "al_jazira_bank"]
+
+
+def consolidation(module, rows, files, pages):
+    """module's combined frame for a synthetic statement, tiled to `rows` rows over `files` file names."""
+    df = module.combine([module.parse_file(io.BytesIO(make_statement(module.__name__, pages)), "statement.pdf")])
+    df = df.iloc[np.resize(np.arange(len(df)), rows)].reset_index(drop=True)
+    source = module.fields.get("source")
+    if source in df.columns:
+        names = np.array([f"statement_{i:04d}.pdf" for i in range(files)], dtype=object)
+        df[source] = pd.array(names[np.arange(rows) * files // rows], dtype="str")
+    return df
+
+
+def join_seconds(df, keys):
+    sample = df[keys].iloc[::100].drop_duplicates()
+    started = time.perf_counter()
+    df.merge(sample, on=keys)
+    return time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Compare plain and schema.typed() consolidated frames.")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Rows in each consolidated frame")
+    parser.add_argument("--files", type=int, default=250, help="Statements the rows are spread over")
+    parser.add_argument("--pages", type=int, default=10, help="Pages of the synthetic statement tiled")
+    parser.add_argument("--bank", action="append", choices=BANKS, help="Bank module (repeatable; default: all)")
+    args = parser.parse_args(argv)
+
+    page_pool.disable()
+    failed = []
+    print(f"{'bank':<22} {'plain MB':>9} {'typed MB':>9} {'ratio':>6} {'typed() s':>9} "
+          f"{'join plain s':>12} {'join typed s':>12}  status")
+    for bank in args.bank or BANKS:
+        module = importlib.import_module(bank)
+        df = consolidation(module, args.rows, args.files, args.pages)
+        started = time.perf_counter()
+        typed = schema.typed(df, module)
+        convert = time.perf_counter() - started
+
+        lost = [column for column in typed.attrs[schema.FILS_ATTR]
+                if not np.allclose(np.nan_to_num(schema.numbers(df[column]), nan=-1.0),
+                                   np.nan_to_num(schema.from_fils(typed[column]), nan=-1.0), atol=0.005)]
+        if lost:
+            failed.append(bank)
+
+        keys = [module.fields["date"][0], module.fields["balance"]]
+        plain_mb = df.memory_usage(deep=True).sum() / 1e6
+        typed_mb = typed.memory_usage(deep=True).sum() / 1e6
+        print(f"{bank:<22} {plain_mb:>9.1f} {typed_mb:>9.1f} {plain_mb / typed_mb:>5.1f}x {convert:>9.2f} "
+              f"{join_seconds(df, keys):>12.2f} {join_seconds(typed, keys):>12.2f}  "
+              f"{'ok' if not lost else f'AMOUNTS CHANGED in {lost}'}")
+
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,87 +1,122 @@
-import pdfplumber
+import numpy as np
 import pandas as pd
 import streamlit as st
 
+import export
+import incremental
+import page_pool
+import page_triage
+import reconcile
+import store
+import streaming
+import timing
+
+PARSER_VERSION = "3"  # see parse_cache.py
+
 # -------------------- PDF Parsing Logic --------------------
 
 header_keywords = ["Transaction Date", "Narration", "Debit", "Credit", "Running Balance"]
+columns = ["Transaction Date", "Narration", "Debit", "Credit", "Account Balance"]
 
-def process(pdf_files):
-    all_transactions = []
+# Column map read by store.py, reconcile.py and schema.py; wrapped rows repeat
+# the balance with no amount, so they reconcile as they are
+fields = {"date": ("Transaction Date", "%d-%m-%Y"), "debit": "Debit", "credit": "Credit",
+          "balance": "Account Balance", "description": "Narration"}
+
+def extract_page_rows(page):
+    structured_data = []
+    with timing.span("extract_table"):
+        table = page.extract_table()
+
+    if table:
+        for row in table:
+            if len(row) < 6:
+                continue
+
+            if any(header in row[0] for header in header_keywords) and "Running Balance" in row:
+                continue
+
+            transaction_date = row[0].replace("\n", " ").strip()
+            narration = row[2].replace("\n", " ").strip()
 
-    for pdf_file in pdf_files:
-        structured_data = []
+            debit = 0.0
+            credit = 0.0
 
-        with pdfplumber.open(pdf_file) as pdf:
-            for page in pdf.pages:
-                table = page.extract_table()
+            try:
+                if row[3] and row[3] != "0.00":
+                    debit = float(row[3].replace(',', '').strip())
+            except ValueError:
+                debit = 0.0
 
-                if table:
-                    for row in table:
-                        if len(row) < 6:
-                            continue
+            try:
+                if row[4] and row[4] != "0.00":
+                    credit = float(row[4].replace(',', '').strip())
+            except ValueError:
+                credit = 0.0
 
-                        if any(header in row[0] for header in header_keywords) and "Running Balance" in row:
-                            continue
+            running_balance = row[5].replace("\n", " ").strip() if len(row) > 5 else None
 
-                        transaction_date = row[0].replace("\n", " ").strip()
-                        narration = row[2].replace("\n", " ").strip()
+            structured_data.append([transaction_date, narration, debit, credit, running_balance])
 
-                        debit = 0.0
-                        credit = 0.0
+    return structured_data
 
-                        try:
-                            if row[3] and row[3] != "0.00":
-                                debit = float(row[3].replace(',', '').strip())
-                        except ValueError:
-                            debit = 0.0
+# Table detection only runs on pages with the header row or dated rows (see page_triage.py)
+page_probe = page_triage.PageProbe(r"\d{2}-\d{2}-\d{4}", markers=["Running Balance"])
 
-                        try:
-                            if row[4] and row[4] != "0.00":
-                                credit = float(row[4].replace(',', '').strip())
-                        except ValueError:
-                            credit = 0.0
+def iter_pages(pdf_file, filename=None):
+    return page_pool.imap_pages(pdf_file, extract_page_rows, page_triage.select(pdf_file, page_probe))
 
-                        running_balance = row[5].replace("\n", " ").strip() if len(row) > 5 else None
+def extract_rows(pdf_file):
+    return streaming.collect(iter_pages(pdf_file), columns)
 
-                        structured_data.append([transaction_date, narration, debit, credit, running_balance])
+def to_frame(buffer, filename=None):
+    return buffer.to_frame()
 
-        all_transactions.extend(structured_data)
+def parse_file(pdf_file, filename):
+    return to_frame(extract_rows(pdf_file), filename)
+
+def combine(frames, opening_balance=None):
+    df_combined = pd.concat(frames, ignore_index=True)
 
     # ✅ Return empty DataFrame if no transactions found
-    if not all_transactions:
-        return pd.DataFrame(columns=["Transaction Date", "Narration", "Debit", "Credit", "Account Balance"])
+    if df_combined.empty:
+        return pd.DataFrame(columns=columns)
 
-    df_combined = pd.DataFrame(all_transactions, columns=["Transaction Date", "Narration", "Debit", "Credit", "Account Balance"])
     df_combined = df_combined[df_combined["Transaction Date"] != "Transaction Date"]
     df_combined["Account Balance"] = df_combined["Account Balance"].astype(str)
-    df_combined["Transaction Date"] = pd.to_datetime(df_combined["Transaction Date"], format="%d-%m-%Y", errors='coerce')
+    with timing.span("to_datetime"):
+        df_combined["Transaction Date"] = pd.to_datetime(df_combined["Transaction Date"], format="%d-%m-%Y", errors='coerce')
     df_combined = df_combined.dropna(subset=["Transaction Date"])
 
-    merged_data = []
-    prev_row = None
-
-    for _, row in df_combined.iterrows():
-        if prev_row is not None and row["Account Balance"] == prev_row["Account Balance"]:
-            prev_row["Narration"] += " " + row["Narration"]
-            prev_row["Debit"] = max(prev_row["Debit"], row["Debit"])
-            prev_row["Credit"] = max(prev_row["Credit"], row["Credit"])
-        else:
-            if prev_row is not None:
-                merged_data.append(prev_row)
-            prev_row = row.copy()
-
-    if prev_row is not None:
-        merged_data.append(prev_row)
+    # Consecutive rows sharing a balance are one wrapped transaction: find where
+    # each run starts, then reduce every run at once (joined narration, largest
+    # debit/credit); the merged row keeps its first row's date, balance and index
+    with timing.span("merge_rows"):
+        balance = df_combined["Account Balance"].to_numpy()
+        run_start = np.ones(len(balance), dtype=bool)
+        run_start[1:] = balance[1:] != balance[:-1]
+        starts = np.flatnonzero(run_start)
+
+        df_final = df_combined.iloc[starts].copy()
+        if len(starts):
+            narration = df_combined["Narration"].to_numpy(dtype=object)
+            df_final["Narration"] = np.add.reduceat(np.where(run_start, narration, " " + narration), starts)
+            df_final["Debit"] = np.maximum.reduceat(df_combined["Debit"].to_numpy(), starts)
+            df_final["Credit"] = np.maximum.reduceat(df_combined["Credit"].to_numpy(), starts)
 
-    df_final = pd.DataFrame(merged_data)
     df_final = df_final.sort_values(by="Transaction Date", ascending=True)
     df_final = df_final.drop_duplicates(subset=["Account Balance"], keep="first")
 
     return df_final
 
+def process(pdf_files):
+    frames = [incremental.parse(pdf_file, __name__) for pdf_file in pdf_files]
+    with timing.span("combine"):
+        return incremental.combine(pdf_files, frames, __name__)
+
 # -------------------- Streamlit UI --------------------
 
+@timing.timed_run
 def run():
     #st.header("Bank PDF Processor")
     st.subheader("Bank PDF Processor")
@@ -95,12 +130,16 @@ def run():
     if uploaded_files:
         st.info("Processing uploaded files...")
         df = process(uploaded_files)
+        if df is None:  # still parsing in the background
+            return
 
         if df.empty:
             st.warning("No transactions found.")
         else:
             st.success("Transactions extracted successfully!")
-            st.dataframe(df)
+            with timing.span("render"):
+                st.dataframe(df)
 
-            csv = df.to_csv(index=False).encode("utf-8")
-            st.download_button("Download CSV", csv, "emirates_islamic_transactions.csv", "text/csv")
+            reconcile.panel(uploaded_files, __name__)
+            export.download_button("Download", df, "emirates_islamic_transactions", bank=__name__)
+            store.panel(uploaded_files, __name__, "emirates_islamic_transactions")
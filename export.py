@@ -0,0 +1,136 @@
+# export.py – CSV, Parquet and Arrow IPC export of combined statements
+#
+# run() used to build `df.to_csv(index=False).encode("utf-8")` on every rerun:
+# the whole CSV as one str, then a second bytes copy, just to hand to
+# st.download_button. download_button() now passes Streamlit a callable, so
+# the file is only generated when the user clicks, and the writers spool to a
+# temp file (in memory up to SPOOL_MAX_BYTES, on disk beyond) that is read
+# back as the one bytes copy Streamlit serves (it accepts bytes, BytesIO or
+# plain file objects, not a SpooledTemporaryFile):
+#
+#   CSV        written CSV_CHUNK_ROWS rows at a time
+#   Parquet    typed columns, zstd-compressed
+#   Arrow IPC  typed columns, zstd-compressed record batches
+#
+# Given the bank, download_button() writes Parquet and Arrow from the
+# schema.typed() frame: datetime64 dates, categorical file names and money as
+# int64 fils, each such field tagged with {"unit": "fils"} metadata. CSV keeps
+# decimal amounts either way. Parquet and Arrow need pyarrow; without it only
+# CSV is offered.
+
+import importlib.util
+import io
+import os
+import tempfile
+
+import schema
+
+CSV_CHUNK_ROWS = 50_000
+SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+
+# ==== Writers (each writes df to a binary file object) ====
+def write_csv(df, fh):
+    df = schema.plain(df)
+    text = io.TextIOWrapper(fh, encoding="utf-8", newline="")
+    # At least one chunk, so an empty frame still gets its header row
+    for start in range(0, max(len(df), 1), CSV_CHUNK_ROWS):
+        df.iloc[start:start + CSV_CHUNK_ROWS].to_csv(text, index=False, header=start == 0)
+    text.flush()
+    text.detach()
+
+
+def arrow_table(df):
+    import pyarrow as pa
+
+    try:
+        table = pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowInvalid, pa.ArrowTypeError):
+        # Object columns mixing numbers and text (e.g. unparsed balances) become strings
+        df = df.copy()
+        for col in df.columns[df.dtypes == object]:
+            df[col] = df[col].astype("string")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+
+    fils = df.attrs.get(schema.FILS_ATTR) or []
+    if fils:
+        fields = [field.with_metadata({"unit": "fils"}) if field.name in fils else field for field in table.schema]
+        table = table.cast(pa.schema(fields, metadata=table.schema.metadata))
+    return table
+
+
+def write_parquet(df, fh):
+    import pyarrow.parquet as pq
+
+    pq.write_table(arrow_table(df), fh, compression="zstd")
+
+
+def write_arrow(df, fh):
+    import pyarrow as pa
+
+    table = arrow_table(df)
+    options = pa.ipc.IpcWriteOptions(compression="zstd")
+    with pa.ipc.new_file(fh, table.schema, options=options) as writer:
+        writer.write_table(table)
+
+
+# label → (file extension, MIME type, writer)
+formats = {
+    "CSV": (".csv", "text/csv", write_csv),
+    "Parquet": (".parquet", "application/vnd.apache.parquet", write_parquet),
+    "Arrow IPC": (".arrow", "application/vnd.apache.arrow.file", write_arrow),
+}
+
+
+def available_formats():
+    if importlib.util.find_spec("pyarrow") is None:
+        return ["CSV"]
+    return list(formats)
+
+
+def spooled(df, fmt):
+    """Return a spooled temp file holding df in fmt, positioned at the start."""
+    fh = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_BYTES)
+    formats[fmt][2](df, fh)
+    fh.seek(0)
+    return fh
+
+
+def file_bytes(df, fmt):
+    """df in fmt as bytes, built through spooled()."""
+    with spooled(df, fmt) as fh:
+        return fh.read()
+
+
+def write(df, path, bank=None):
+    """Write df to path, choosing the format from its extension (CSV by default).
+
+    With bank, Parquet and Arrow hold its schema.typed() columns, as in download_button().
+    """
+    ext = os.path.splitext(path)[1].lower()
+    fmt = next((name for name, (suffix, _, _) in formats.items() if suffix == ext), "CSV")
+    if bank and fmt != "CSV":
+        df = schema.typed(df, bank)
+    with open(path, "wb") as fh:
+        formats[fmt][2](df, fh)
+
+
+# ==== Streamlit UI ====
+def download_button(label, df, file_stem, key=None, bank=None):
+    """Format picker plus a download button that only builds the file when clicked.
+
+    With bank (a module name), Parquet and Arrow hold its schema.typed() columns.
+    """
+    import streamlit as st
+
+    choices = available_formats()
+    fmt = st.radio("Export format", choices, horizontal=True, key=f"{key or file_stem}-format")
+    ext, mime, _ = formats[fmt]
+
+    def build():
+        return file_bytes(schema.typed(df, bank) if bank and fmt != "CSV" else df, fmt)
+
+    return st.download_button(
+        label, build, f"{file_stem}{ext}", mime,
+        key=key, on_click="ignore"
+    )
@@ -1,32 +1,72 @@
 import streamlit as st
-import PyPDF2
+import os
 import re
+import numpy as np
 import pandas as pd
 from io import BytesIO
 
-# Step 1: Extract cleaned lines
-def extract_clean_lines(pdf_file):
-    unwanted_phrases = [
-        "Important:", "*T&Cs Apply", "600  52  5500", "First Abu Dhabi Bank PJSC",
-        "We shall endeavor", "KHALID MOHAMED OBAID", "P.O.BOX 35566",
-        "United Arab EmiratesAC-NUM", "IBAN", "Old Account Number",
-        "Account Statement FROM", "Sheet no", "Balance brought forward"
-    ]
+import export
+import incremental
+import page_text
+import reconcile
+import store
+import streaming
+import timing
+from line_classifier import LineClassifier, NOISE, START
+from transaction_buffer import PendingTransaction
+
+text_backend = os.environ.get("FAB_TEXT_BACKEND", "pypdf2")  # see page_text.py
+
+PARSER_VERSION = f"3-{text_backend}"  # see parse_cache.py
+
+columns = ["Date", "Value Date", "Description"]
+
+# Column map read by store.py, reconcile.py and schema.py. Amount is printed
+# without a sign (the balance movement gives it); Extracted Amount is the
+# figure diffed from consecutive balances
+fields = {"date": ("Date", "%d %b %Y"), "value_date": ("Value Date", "%d %b %Y"), "unsigned": "Amount",
+          "balance": "Balance", "description": "Description", "source": "Source File",
+          "other_money": ["Extracted Amount"]}
+
+unwanted_phrases = [
+    "Important:", "*T&Cs Apply", "600  52  5500", "First Abu Dhabi Bank PJSC",
+    "We shall endeavor", "KHALID MOHAMED OBAID", "P.O.BOX 35566",
+    "United Arab EmiratesAC-NUM", "IBAN", "Old Account Number",
+    "Account Statement FROM", "Sheet no", "Balance brought forward"
+]
+
+# Two dates at the start of a line; whitespace runs match because the raw line
+# is classified before it is cleaned
+transaction_start_pattern = re.compile(r"\d{1,2}\s+\w{3}\s+\d{4}\s+\d{1,2}\s+\w{3}\s+\d{4}")
+whitespace_pattern = re.compile(r'\s+')
+
+line_classifier = LineClassifier(noise=unwanted_phrases, start=transaction_start_pattern)
+
+# Step 1: Classify a page's raw text into cleaned lines as (is_start, line)
+def classify_page_lines(text):
     lines = []
-    reader = PyPDF2.PdfReader(pdf_file)
-    for page in reader.pages:
-        page_text = page.extract_text()
-        if page_text:
-            for line in page_text.splitlines():
-                if not any(phrase in line for phrase in unwanted_phrases):
-                    clean = re.sub(r'\s+', ' ', line.strip())
-                    if clean:
-                        lines.append(clean)
+    if text:
+        for line in text.splitlines():
+            kind, _ = line_classifier.classify(line)
+            if kind == NOISE:
+                continue
+            clean = whitespace_pattern.sub(' ', line.strip())
+            if clean:
+                lines.append((kind == START, clean))
+    return lines
+
+def clean_page_lines(text):
+    return [line for _, line in classify_page_lines(text)]
+
+def extract_clean_lines(pdf_file, backend=None):
+    lines = []
+    for _, _, text in page_text.iter_texts(pdf_file, backend or text_backend):
+        lines.extend(clean_page_lines(text))
     return lines
 
 # Step 2: Check if line is start of transaction
 def is_transaction_start(line):
-    return re.match(r"^\d{1,2} \w{3} \d{4}\s+\d{1,2} \w{3} \d{4}", line) is not None
+    return transaction_start_pattern.match(line) is not None
 
 # Step 3: Group lines into transactions
 def group_transactions(lines):
@@ -62,42 +102,76 @@ def extract_date_and_description(block):
             desc = first_line
 
     full_description = desc + " " + " ".join(block[1:])
-    return {
-        "Date": date,
-        "Value Date": value_date,
-        "Description": full_description.strip()
-    }
-
-# Step 5: Extract amount & balance
-def extract_amount_balance_from_description(description):
-    matches = re.findall(r'(?<!\d)(-?\d{1,3}(?:,\d{3})*\.\d{2})(?!\s*%)', description)
-    if len(matches) >= 2:
-        amount = matches[0].replace(',', '')
-        balance = matches[1].replace(',', '')
-    elif len(matches) == 1:
-        amount = matches[0].replace(',', '')
-        balance = ''
-    else:
-        amount = balance = ''
-    return pd.Series([amount, balance])
-
-# Step 6: Process single PDF
-def process_pdf(pdf_file, filename="uploaded.pdf"):
-    lines = extract_clean_lines(pdf_file)
-    blocks = group_transactions(lines)
-    data = [extract_date_and_description(block) for block in blocks]
-    df = pd.DataFrame(data)
+    return date, value_date, full_description.strip()
+
+# Step 5: Extract amount & balance (first and second money figure) for a whole column
+amount_pattern = re.compile(r'(?<!\d)(-?\d{1,3}(?:,\d{3})*\.\d{2})(?!\s*%)')
+header_row_pattern = re.compile(r'date\s+value\s+date\s+description\s+debit\s+credit\s+balance', re.IGNORECASE)
+
+def extract_amounts_balances(descriptions):
+    matches = descriptions.str.extractall(amount_pattern)[0]
+    matches = matches.str.replace(',', '', regex=False).astype(float)
+    position = matches.index.get_level_values('match')
+    amount = matches[position == 0].droplevel('match').reindex(descriptions.index)
+    balance = matches[position == 1].droplevel('match').reindex(descriptions.index)
+    return amount, balance
+
+# Step 6: Stream transactions page by page (only the open block spans pages)
+def iter_pages(pdf_file, filename="uploaded.pdf", backend=None):
+    current = PendingTransaction()
+    for page_no, page_count, text in page_text.iter_texts(pdf_file, backend or text_backend):
+        data = []
+        for is_start, line in classify_page_lines(text):
+            if is_start and current:
+                data.append(extract_date_and_description(current.lines))
+                current = PendingTransaction()
+            current.add(line)
+        if page_no == page_count and current:
+            data.append(extract_date_and_description(current.lines))
+        yield page_no, page_count, data
+
+# Step 7: Build the per-file frame
+def to_frame(buffer, filename="uploaded.pdf"):
+    df = buffer.to_frame()
     df['Source File'] = filename
 
     # Filter out unwanted header-like rows
-    df['Description_clean'] = df['Description'].str.replace(r'\s+', ' ', regex=True).str.strip().str.lower()
-    df = df[~df['Description_clean'].str.contains("date value date description debit credit balance")]
-    df.drop(columns=['Description_clean'], inplace=True)
+    df = df[~df['Description'].str.contains(header_row_pattern)].copy()
+
+    with timing.span("amounts"):
+        df['Amount'], df['Balance'] = extract_amounts_balances(df['Description'])
+    return df
 
-    df[['Amount', 'Balance']] = df['Description'].apply(extract_amount_balance_from_description)
+def process_pdf(pdf_file, filename="uploaded.pdf", backend=None):
+    return to_frame(streaming.collect(iter_pages(pdf_file, filename, backend), columns), filename)
+
+# Step 8: Headless entry points (used by run() and batch_convert)
+def parse_file(pdf_file, filename, backend=None):
+    return process_pdf(pdf_file, filename, backend)
+
+# Per-file part of combine(); the first row of each file is set by link()
+def prepare(df):
+    df = df.copy()
+    df['Balance'] = pd.to_numeric(df['Balance'], errors='coerce')
+    df['Extracted Amount'] = df['Balance'].diff().round(2)
     return df
 
-# Step 7: Streamlit run function
+# The amount on a file's first row comes from the previous file's last balance
+def link(final_df, start, opening_balance=None):
+    if start > 0:
+        previous = final_df['Balance'].iat[start - 1]
+    elif opening_balance is not None:
+        previous = opening_balance
+    else:
+        return
+    column = final_df.columns.get_loc('Extracted Amount')
+    final_df.iat[start, column] = np.round(final_df['Balance'].iat[start] - previous, 2)
+
+def combine(frames, opening_balance=None):
+    return incremental.join([prepare(df) for df in frames], link, opening_balance)
+
+# Step 9: Streamlit run function
+@timing.timed_run
 def run():
     #st.header("Bank PDF Processor")
     st.subheader("Bank PDF Processor")
@@ -115,23 +189,21 @@ def run():
         all_dfs = []
         for file in uploaded_files:
             st.write(f"📄 Processing: {file.name}")
-            df = process_pdf(file, file.name)
+            df = incremental.parse(file, __name__)
             all_dfs.append(df)
 
         if all_dfs:
-            final_df = pd.concat(all_dfs, ignore_index=True)
-
-            final_df['Balance'] = pd.to_numeric(final_df['Balance'], errors='coerce')
-            final_df['Extracted Amount'] = final_df['Balance'].diff()
-            if opening_balance is not None and not final_df.empty:
-                final_df.loc[0, 'Extracted Amount'] = final_df.loc[0, 'Balance'] - opening_balance
-
-            final_df['Extracted Amount'] = final_df['Extracted Amount'].round(2)
+            with timing.span("combine"):
+                final_df = incremental.combine(uploaded_files, all_dfs, __name__, opening_balance=opening_balance)
+            if final_df is None:  # still parsing in the background
+                return
 
             st.success("✅ Transactions Extracted")
-            st.dataframe(final_df)
+            with timing.span("render"):
+                st.dataframe(final_df)
 
-            csv = final_df.to_csv(index=False).encode("utf-8")
-            st.download_button("Download CSV", csv, "fab_transactions.csv", "text/csv")
+            reconcile.panel(uploaded_files, __name__)
+            export.download_button("Download", final_df, "fab_transactions", bank=__name__)
+            store.panel(uploaded_files, __name__, "fab_transactions")
         else:
             st.warning("⚠️ No valid transactions found.")
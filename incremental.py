@@ -0,0 +1,145 @@
+# incremental.py – Reuse per-file work across reruns as uploads are added
+#
+# Streamlit reruns run() on every interaction. Adding an eleventh statement to
+# a file_uploader used to send all eleven back through parse_with_progress
+# (hashing each for parse_cache) and rebuild the combined frame, with its
+# cross-file Balance.diff(), from scratch. Both steps now keep their results
+# in st.session_state, per bank namespace, keyed by each upload's file id:
+#
+#   parse(file, bank)          parses only uploads not seen on an earlier rerun,
+#                              in a background job (see jobs.py); None until
+#                              the job is done
+#   combine(files, frames, bank, opening_balance)
+#                              returns the previous combined frame when nothing
+#                              changed, and otherwise re-derives only the rows
+#                              at file boundaries; None while any frame is
+#                              still pending
+#   reports(files, bank)       each parsed file's running-balance check
+#                              (see reconcile.py), kept alongside its frame
+#
+# Bank modules whose combine() derives columns across rows (FAB's "Extracted
+# Amount", Mashreq's "Amount") split it into prepare(df), the per-file part,
+# cached per upload, and link(df, start, opening_balance), which fixes the
+# first row of a file at `start` in the combined frame. join() glues the two
+# together and is what those modules' own combine() uses, so headless callers
+# get the same result. When files are only appended, the new ones are joined
+# onto the previous combined frame and only their boundaries are linked. Other
+# modules' combine() is rerun only when the set of files changes.
+
+import importlib
+
+import pandas as pd
+import streamlit as st
+
+import jobs
+import streaming
+
+
+class UploadState:
+    """Per-namespace results kept in st.session_state between reruns."""
+
+    def __init__(self):
+        self.parsed = {}    # file key → parsed per-file frame
+        self.reports = {}   # file key → its reconcile.Reconciliation (or None)
+        self.prepared = {}  # file key → module.prepare(parsed frame)
+        self.combined = None  # (file keys, opening balance, combined frame)
+
+    def prune(self, keys):
+        """Forget files that are no longer uploaded."""
+        keep = set(keys)
+        for cache in (self.parsed, self.reports, self.prepared):
+            for key in [key for key in cache if key not in keep]:
+                del cache[key]
+
+
+def file_key(file):
+    # file_id is unique per upload, so a re-uploaded or replaced file is parsed again
+    return getattr(file, "file_id", None) or (file.name, getattr(file, "size", None))
+
+
+def _state(namespace):
+    name = f"incremental-{namespace}"
+    if name not in st.session_state:
+        st.session_state[name] = UploadState()
+    return st.session_state[name]
+
+
+def parse(file, bank, namespace=None, **options):
+    """Parsed frame for file, or None while its background job is still running.
+
+    Uploads already parsed this session are returned without parsing again.
+    """
+    state = _state(namespace or bank)
+    key = file_key(file)
+    if key not in state.parsed:
+        if jobs.ENABLED:
+            parsed = jobs.collect(file, key, bank, namespace, **options)
+            if parsed is None:
+                return None
+        else:
+            parsed = streaming.parse_with_progress(file, bank, namespace, **options)
+        state.parsed[key], state.reports[key] = parsed
+    return state.parsed[key]
+
+
+def reports(files, bank, namespace=None):
+    """[(file name, reconcile.Reconciliation or None)] for the files parsed so far."""
+    state = _state(namespace or bank)
+    return [(file.name, state.reports[file_key(file)]) for file in files if file_key(file) in state.reports]
+
+
+def join(prepared, link, opening_balance=None, head=None, columns=None):
+    """Concatenate prepared per-file frames, linking the first row of each.
+
+    link(df, start, opening_balance) is called for every non-empty frame with
+    start its first row in the result. head, an earlier join() result, is
+    kept as is and the frames are appended after it.
+    """
+    frames = ([head] if head is not None else []) + list(prepared)
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    df = pd.concat([frame for frame in frames if len(frame)] or frames, ignore_index=True)
+
+    start = 0 if head is None else len(head)
+    for frame in prepared:
+        if len(frame):
+            link(df, start, opening_balance)
+            start += len(frame)
+    return df
+
+
+def combine(files, frames, bank, namespace=None, opening_balance=None):
+    """bank's combine(frames, opening_balance), reusing the last rerun's work where it can.
+
+    Returns None while any of frames is still being parsed.
+    """
+    module = importlib.import_module(bank)
+    state = _state(namespace or bank)
+    keys = [file_key(file) for file in files]
+    state.prune(keys)
+    if jobs.ENABLED:
+        jobs.session_jobs().prune(namespace or bank, keys)
+    if any(frame is None for frame in frames):
+        return None
+
+    previous = state.combined
+    if previous is not None and previous[:2] == (keys, opening_balance):
+        return previous[2]
+
+    if not hasattr(module, "prepare"):
+        df = module.combine(frames, opening_balance)
+    else:
+        prepared = []
+        for key, frame in zip(keys, frames):
+            if key not in state.prepared:
+                state.prepared[key] = module.prepare(frame)
+            prepared.append(state.prepared[key])
+
+        if previous is not None and previous[1] == opening_balance and keys[:len(previous[0])] == previous[0]:
+            # Files were only added at the end: extend the previous combined frame
+            df = join(prepared[len(previous[0]):], module.link, opening_balance, head=previous[2])
+        else:
+            df = join(prepared, module.link, opening_balance)
+
+    state.combined = (keys, opening_balance, df)
+    return df
@@ -0,0 +1,348 @@
+# jobs.py – Parse uploads on a background thread per session
+#
+# run() used to parse inline on the script thread, so the page froze for the
+# length of a statement and any click stopped the script and started the parse
+# over. submit() now hands each upload to its session's worker thread and the
+# script carries on. While a job is queued or running, show() renders its page
+# progress, the latest rows and a Cancel button in a fragment that refreshes
+# every REFRESH_SECONDS; when the job ends the fragment reruns the app, and
+# collect() hands the frame to the rerun (see incremental.parse).
+#
+# Jobs live in st.session_state, so they survive reruns, but every session's
+# jobs run on one process-wide WorkerPool, so concurrent sessions no longer
+# each bring their own thread and oversubscribe the replica:
+#
+#   BANK_PARSE_WORKERS     jobs parsed at once (default: half the CPUs), each on
+#                          a thread of this process; pages and OCR that jobs
+#                          fan out go to page_pool's one shared pool of
+#                          BANK_PAGE_WORKERS processes, so the process count
+#                          stays fixed however many jobs run (see page_pool.py)
+#   fair queuing           sessions take turns, one job each, so a 200-file
+#                          year-end batch does not hold up a colleague's single
+#                          statement; a session's own jobs start in submission order
+#   BANK_PARSE_MEMORY_MB   memory the running jobs may reserve between them; a
+#                          job reserves BANK_JOB_MEMORY_MB plus JOB_MEMORY_PER_BYTE
+#                          times its PDF size, and the next job in turn waits
+#                          until its reservation fits (a job runs alone if it
+#                          needs more than the whole budget)
+#
+# Queued jobs show their place in line. Queued jobs whose page has stopped
+# polling them for ABANDON_SECONDS (the tab was closed, or another bank's page
+# opened) are dropped, and submitted again if the page comes back. Workers
+# never call Streamlit; they only update their ParseJob.
+# BANK_BACKGROUND_PARSE=0 parses inline instead, outside the pool.
+
+import importlib
+import io
+import itertools
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+
+import streamlit as st
+
+import parse_cache
+import streaming
+import timing
+
+ENABLED = os.environ.get("BANK_BACKGROUND_PARSE", "1") != "0"
+REFRESH_SECONDS = 0.5
+# How long a newly submitted job may block the script, so cache hits and tiny
+# statements show their result on the same run instead of a progress bar
+FIRST_WAIT_SECONDS = 0.25
+
+MAX_WORKERS = int(os.environ.get("BANK_PARSE_WORKERS", str(max(1, (os.cpu_count() or 1) // 2))))
+MEMORY_BUDGET_MB = int(os.environ.get("BANK_PARSE_MEMORY_MB", "1024"))
+JOB_MEMORY_MB = int(os.environ.get("BANK_JOB_MEMORY_MB", "128"))
+# Page text, row lists and frames of a parse grow with the PDF; deliberately generous
+JOB_MEMORY_PER_BYTE = 20
+ABANDON_SECONDS = 60
+
+MB = 1024 * 1024
+
+QUEUED, RUNNING, DONE, FAILED, CANCELLED = "queued", "running", "done", "failed", "cancelled"
+
+_ids = itertools.count(1)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class Cancelled(Exception):
+    """Raised between pages once a job's Cancel button has been pressed."""
+
+
+class ParseJob:
+    """One upload's parse: its status and progress, written by the worker thread."""
+
+    def __init__(self, file, bank, namespace=None, options=None):
+        self.id = next(_ids)
+        self.name = file.name
+        self.bank = bank
+        self.namespace = namespace
+        self.options = options or {}
+        # For uploads this is the upload's own bytes object, not a copy
+        self.data = parse_cache.read_bytes(file)
+        self.memory = JOB_MEMORY_MB * MB + len(self.data) * JOB_MEMORY_PER_BYTE
+        self.seen = time.monotonic()  # last time a script run or fragment asked after the job
+        self.status = QUEUED
+        self.page_no = 0
+        self.page_count = 0
+        self.rows = 0
+        self.preview = None
+        self.result = None  # (frame, reconciliation) as returned by streaming.parse
+        self.error = None
+        self.timings = []
+        self._cancel = threading.Event()
+        self._finished = threading.Event()
+        self._pool = None
+
+    def cancel(self):
+        self._cancel.set()
+        if self._pool is not None:
+            self._pool.withdraw(self)
+
+    def wait(self, timeout=None):
+        return self._finished.wait(timeout)
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def _on_page(self, page_no, page_count, rows):
+        if self._cancel.is_set():
+            raise Cancelled()
+        self.page_no, self.page_count, self.rows = page_no, page_count, len(rows)
+        if rows and time.monotonic() - self._last_preview >= streaming.PREVIEW_INTERVAL:
+            with timing.span("preview"):
+                self.preview = self._module.to_frame(rows.tail(streaming.PREVIEW_ROWS), self.name)
+            self._last_preview = time.monotonic()
+
+    @property
+    def position(self):
+        """(place in line, jobs queued) while queued, else None."""
+        return self._pool.position(self) if self.status == QUEUED and self._pool is not None else None
+
+    def _skip(self):
+        self.status = CANCELLED
+        self.data = None
+        self._finished.set()
+
+    def run(self):
+        """Parse on the worker thread (called by the WorkerPool)."""
+        if self._cancel.is_set():
+            self._skip()
+            return
+        self.status = RUNNING
+        self._module = importlib.import_module(self.bank)
+        self._last_preview = 0.0
+        source = io.BytesIO(self.data)
+        source.name = self.name
+        try:
+            with timing.collecting(timing.RunTimings(self.bank)) as run:
+                self.result = streaming.parse(source, self.bank, self.namespace, self._on_page, **self.options)
+            self.timings = run.files
+            self.status = DONE
+        except Cancelled:
+            self.status = CANCELLED
+        except Exception as exc:
+            self.error = exc
+            self.status = FAILED
+        finally:
+            self.data = None
+            self.preview = None
+            self._finished.set()
+
+
+class WorkerPool:
+    """Parse workers shared by every session: a concurrency cap, turns per session and a memory budget."""
+
+    def __init__(self, workers=MAX_WORKERS, memory_mb=MEMORY_BUDGET_MB):
+        self.workers = max(1, workers)
+        self.memory_budget = memory_mb * MB
+        self.running = 0
+        self.reserved = 0
+        self._queues = OrderedDict()  # session → deque of its queued jobs, the session whose turn it is first
+        self._threads = []
+        self._changed = threading.Condition()
+
+    def submit(self, session, job):
+        with self._changed:
+            job._pool = self
+            self._queues.setdefault(session, deque()).append(job)
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._work, name=f"bank-parse-{len(self._threads) + 1}", daemon=True)
+                self._threads.append(thread)
+                thread.start()
+            self._changed.notify()
+
+    def withdraw(self, job):
+        """Take a queued job out of line; a running one stops at its next page instead."""
+        with self._changed:
+            for session, queue in self._queues.items():
+                if job in queue:
+                    queue.remove(job)
+                    if not queue:
+                        del self._queues[session]
+                    job._skip()
+                    return
+
+    def position(self, job):
+        """(1-based place in line, jobs queued) for a queued job, else None."""
+        with self._changed:
+            queues = [list(queue) for queue in self._queues.values()]
+        # Turns go round the sessions, one job each
+        line = [queue[turn] for turn in range(max(map(len, queues), default=0)) for queue in queues
+                if turn < len(queue)]
+        return (line.index(job) + 1, len(line)) if job in line else None
+
+    def _next(self):
+        """The job to start now, or None; called holding the lock."""
+        now = time.monotonic()
+        for session in list(self._queues):
+            queue = self._queues[session]
+            for job in [job for job in queue if now - job.seen > ABANDON_SECONDS]:
+                queue.remove(job)
+                job._skip()
+            if not queue:
+                del self._queues[session]
+        if not self._queues:
+            return None
+
+        # Only the session whose turn it is may start a job, so a large job is
+        # not passed over indefinitely by smaller ones while memory frees up
+        session, queue = next(iter(self._queues.items()))
+        job = queue[0]
+        memory = min(job.memory, self.memory_budget)
+        if self.running and self.reserved + memory > self.memory_budget:
+            return None
+        queue.popleft()
+        if queue:
+            self._queues.move_to_end(session)
+        else:
+            del self._queues[session]
+        self.running += 1
+        self.reserved += memory
+        return job, memory
+
+    def _work(self):
+        while True:
+            with self._changed:
+                picked = self._next()
+                while picked is None:
+                    # Timed, so abandoned jobs are dropped even when nothing else happens
+                    self._changed.wait(timeout=1.0)
+                    picked = self._next()
+            job, memory = picked
+            try:
+                job.run()
+            finally:
+                with self._changed:
+                    self.running -= 1
+                    self.reserved -= memory
+                    self._changed.notify_all()
+
+
+def pool():
+    """The process-wide WorkerPool, shared by all sessions."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = WorkerPool()
+        return _pool
+
+
+class SessionJobs:
+    """A session's jobs by (namespace, file key); they run on the shared WorkerPool."""
+
+    def __init__(self):
+        self.jobs = {}
+
+    def submit(self, key, file, bank, namespace=None, options=None):
+        job = self.jobs.get(key)
+        if job is None:
+            job = self.jobs[key] = ParseJob(file, bank, namespace, options)
+            pool().submit(self, job)
+        return job
+
+    def discard(self, key):
+        job = self.jobs.pop(key, None)
+        if job is not None:
+            job.cancel()
+
+    def prune(self, namespace, keys):
+        """Cancel and forget namespace's jobs for files that are no longer uploaded."""
+        keep = set(keys)
+        for job_key in [k for k in self.jobs if k[0] == namespace and k[1] not in keep]:
+            self.discard(job_key)
+
+
+def session_jobs():
+    if "parse-jobs" not in st.session_state:
+        st.session_state["parse-jobs"] = SessionJobs()
+    return st.session_state["parse-jobs"]
+
+
+@st.fragment(run_every=REFRESH_SECONDS)
+def show(job):
+    """Progress, latest rows and a Cancel button for a queued or running job."""
+    if not job.active:
+        st.rerun()  # the whole script picks up the result (or the error)
+
+    job.seen = time.monotonic()
+    position = job.position
+    if position is not None:
+        st.progress(0.0, text=f"📄 {job.name}: queued, {position[0]} of {position[1]} in line")
+    elif job.status == QUEUED:
+        st.progress(0.0, text=f"📄 {job.name}: starting")
+    elif job.page_count:
+        st.progress(
+            job.page_no / job.page_count,
+            text=f"📄 {job.name}: page {job.page_no}/{job.page_count} · {job.rows} rows"
+        )
+    else:
+        st.progress(0.0, text=f"📄 {job.name}: opening")
+    preview = job.preview
+    if preview is not None:
+        st.dataframe(preview)
+
+    if st.button("Cancel", key=f"cancel-job-{job.id}"):
+        job.cancel()
+        st.caption("Cancelling after the current page…")
+
+
+def collect(file, key, bank, namespace=None, **options):
+    """Return file's (frame, reconciliation) once its background job is done, else None.
+
+    Submits the job on first call. Failed or cancelled jobs show a message and
+    a button to start them again.
+    """
+    jobs = session_jobs()
+    job_key = (namespace or bank, key)
+    if job_key not in jobs.jobs:
+        jobs.submit(job_key, file, bank, namespace, options).wait(FIRST_WAIT_SECONDS)
+    job = jobs.jobs[job_key]
+    if job.status == CANCELLED and not job._cancel.is_set():
+        # Dropped from the line while its page was not open
+        jobs.discard(job_key)
+        job = jobs.submit(job_key, file, bank, namespace, options)
+    job.seen = time.monotonic()
+
+    if job.status == DONE:
+        jobs.jobs.pop(job_key)
+        timing.attach(job.timings)
+        return job.result
+
+    if not job.active:
+        if job.status == FAILED:
+            st.error(f"❌ {job.name}: {job.error}")
+        else:
+            st.warning(f"⏹️ {job.name}: parsing cancelled.")
+        if not st.button("Parse again", key=f"retry-job-{job.id}"):
+            return None
+        jobs.discard(job_key)
+        job = jobs.submit(job_key, file, bank, namespace, options)
+
+    show(job)
+    return None
@@ -0,0 +1,91 @@
+# line_classifier.py – Compiled per-bank classification of text lines
+#
+# The text parsers (FAB, Mashreq, Rak) drop lines containing any of their noise
+# phrases and then look for a transaction start. LineClassifier compiles a
+# bank's noise phrases into one literal alternation and each of its header,
+# noise and start patterns once, so a line costs a few C-level regex calls
+# instead of a Python-level loop over every phrase plus per-call compiles.
+#
+# The phrases are not merged into one alternation with the patterns: re scans
+# a search over plain literals by their first characters, which the patterns
+# would defeat, and a lazy ".*?" prefix steps one character at a time (see
+# benchmarks/line_classifier.py). Case-insensitive phrases are matched against
+# the lower-cased line for the same reason.
+#
+# Priority is noise phrases, header, noise patterns, then start; lines
+# matching none are BODY.
+
+import re
+
+HEADER = "header"
+NOISE = "noise"
+START = "start"
+BODY = "body"
+
+
+def _embed(pattern):
+    """Source of a str or compiled pattern, keeping IGNORECASE as a scoped flag."""
+    if isinstance(pattern, str):
+        return pattern
+    if pattern.flags & re.IGNORECASE:
+        return f"(?i:{pattern.pattern})"
+    return f"(?:{pattern.pattern})"
+
+
+def _compile(alternatives):
+    return re.compile("|".join(alternatives)) if alternatives else None
+
+
+class LineClassifier:
+    """Classify lines as HEADER, NOISE, START or BODY.
+
+    noise:          literal phrases matched anywhere in the line
+    noise_patterns: extra patterns matched anywhere in the line
+    header:         pattern matched anywhere in the line
+    start:          pattern matched at the start of the line (after whitespace),
+                    or anywhere when start_anywhere is set
+    ignore_case:    match the noise phrases case-insensitively
+    """
+
+    __slots__ = ("phrases", "fold_case", "header", "noise_pattern", "start", "start_anywhere")
+
+    def __init__(self, noise=(), noise_patterns=(), header=None, start=None,
+                 ignore_case=False, start_anywhere=False):
+        self.fold_case = ignore_case
+        if ignore_case:
+            noise = [phrase.lower() for phrase in noise]
+        # Longest first, so the reported phrase does not depend on list order
+        phrases = sorted(noise, key=len, reverse=True)
+        self.phrases = _compile([re.escape(phrase) for phrase in phrases])
+
+        self.header = _compile([_embed(header)] if header is not None else [])
+        self.noise_pattern = _compile([_embed(p) for p in noise_patterns])
+        if start is not None and not start_anywhere:
+            start = r"\s*" + _embed(start)
+        self.start = _compile([_embed(start)] if start is not None else [])
+        self.start_anywhere = start_anywhere
+
+    def classify(self, line):
+        """Return (kind, match); match is None for BODY.
+
+        match.group() is the matched text (an anchored start includes any
+        leading whitespace). A noise phrase match is made on the lower-cased
+        line when ignore_case is set.
+        """
+        if self.phrases is not None:
+            match = self.phrases.search(line.lower() if self.fold_case else line)
+            if match is not None:
+                return NOISE, match
+        if self.header is not None:
+            match = self.header.search(line)
+            if match is not None:
+                return HEADER, match
+        if self.noise_pattern is not None:
+            match = self.noise_pattern.search(line)
+            if match is not None:
+                return NOISE, match
+        if self.start is not None:
+            match = self.start.search(line) if self.start_anywhere else self.start.match(line)
+            if match is not None:
+                return START, match
+        return BODY, None
@@ -1,10 +1,155 @@
-import PyPDF2
 import re
 import pandas as pd
 import os
 import streamlit as st
 from io import BytesIO
 
+import export
+import incremental
+import page_text
+import store
+import streaming
+import timing
+from line_classifier import LineClassifier, NOISE, START
+from transaction_buffer import PendingTransaction
+
+text_backend = os.environ.get("MASHREQ_TEXT_BACKEND", "pypdf2")  # see page_text.py
+
+PARSER_VERSION = f"4-{text_backend}"  # see parse_cache.py
+
+columns = ["Date", "Description", "Balance"]
+
+# Column map read by store.py, reconcile.py and schema.py. Amount is not the
+# transaction amount: combine() derives it from whichever statements were
+# combined with this one, so it is only typed, neither fingerprinted nor
+# reconciled
+fields = {"date": ("Date", "%Y-%m-%d"), "balance": "Balance", "description": "Description",
+          "source": "Source_File", "other_money": ["Amount"]}
+
+unwanted_phrases = [
+    "Opening balance",
+    "ﺍﻟﺘﺎﺭﻳﺦ",
+    "ﺍﻟﻤﻌﺎﻣﻠﺔ",
+    "ﺭﻗﻢ ﺍﻟﻤﺮﺟﻊ",
+    "ﻗﻴﻮﺩ",
+    "ﻗﻴﻮﺩ ﺩﺍﺋﻨﻪ",
+    "ﺍﻟﺮﺻﻴﺪ",
+    "page",
+    "The items and balance shown",
+    "of the statement date",
+    "All charges, terms and conditions",
+    "Please note that for foreign currency",
+    "verified. Report any discrepancies",
+    "accurate.",
+    "indicative only",
+    "ﺍﻟﺮﺟﺎﺀ ﺍﻟﺘﺄﻛﺪ ﻣﻦ ﺻﺤﺔ ﺍﻟﻤﻌﺎﻣﻼﺕ ﻭﺍﻟﻤﺒﺎﻟﻎ ﺍﻟﻤﺒﻴﻨﺔ ﻏﻰ ﻫﺬﺍ ﺍﻟﻜﺸﻒ",
+    "Closing balance",
+    "8 of 8",
+]
+
+of_pattern = re.compile(r'\bof\s*\d+\b', re.IGNORECASE)
+date_pattern = re.compile(r'\b\d{4}-\d{2}-\d{2}(?=\D)', re.IGNORECASE)
+amount_pattern = re.compile(r'\b(?:\d{1,3}(?:,\d{3})*|\d+)\.\d{1,2}\b|\b0\b')
+header_pattern = re.compile(
+    r'Date\s*Transaction\s*Reference\s*Number\s*Debit\s*Balance\s*Credit',
+    re.IGNORECASE
+)
+
+# Noise phrases and "of N" page markers are dropped; a date anywhere starts a transaction
+line_classifier = LineClassifier(
+    noise=unwanted_phrases, noise_patterns=[of_pattern], start=date_pattern, start_anywhere=True
+)
+
+def iter_transactions(file, backend=None):
+    """Yield (page_no, page_count, [PendingTransaction, ...]) for transactions completed on each page."""
+    current_transaction = PendingTransaction()
+    for page_no, page_count, lines in page_text.iter_lines(file, backend or text_backend):
+        transactions = []
+        for line in lines:
+            line = header_pattern.sub('', line)
+
+            kind, match = line_classifier.classify(line)
+            if kind == NOISE:
+                continue
+
+            if kind == START:
+                if current_transaction:
+                    transactions.append(current_transaction)
+                current_transaction = PendingTransaction(match.group())
+            current_transaction.add(line)
+
+        if page_no == page_count and current_transaction:
+            transactions.append(current_transaction)
+
+        yield page_no, page_count, transactions
+
+def extract_transactions(file, backend=None):
+    return [txn for _, _, transactions in iter_transactions(file, backend) for txn in transactions]
+
+def parse_structured_data(transactions):
+    structured_data = []
+    for txn in transactions:
+        full_text = " ".join(txn.lines).strip()
+        all_amounts = amount_pattern.findall(full_text)
+        balance = all_amounts[-1] if all_amounts else ""
+
+        if balance:
+            balance_index = full_text.rfind(balance)
+            description = (full_text[:balance_index] + full_text[balance_index + len(balance):]).strip()
+        else:
+            description = full_text
+
+        description = re.sub(r'\s+', ' ', description)
+
+        structured_data.append((txn.date, description, balance))
+    return structured_data
+
+def iter_pages(file, filename=None, backend=None):
+    for page_no, page_count, transactions in iter_transactions(file, backend):
+        yield page_no, page_count, parse_structured_data(transactions)
+
+def process_pdf(file):
+    return streaming.collect(iter_pages(file), columns).to_frame()
+
+# === Headless entry points (used by run() and batch_convert) ===
+def to_frame(buffer, filename=None):
+    df = buffer.to_frame()
+    df['Source_File'] = filename
+    return df
+
+def parse_file(file, filename, backend=None):
+    return to_frame(streaming.collect(iter_pages(file, backend=backend), columns), filename)
+
+combined_columns = ['Date', 'Description', 'Balance', 'Amount', 'Source_File']
+
+# Per-file part of combine(): amounts never cross files, only the opening
+# balance is applied to each file's first row by link()
+def prepare(df):
+    if df.empty:
+        return pd.DataFrame(columns=combined_columns)
+
+    df = df[
+        df['Date'].notna() &
+        df['Balance'].notna() &
+        (df['Date'].str.strip() != "") &
+        (df['Balance'].str.strip() != "")
+    ].copy()
+    if df.empty:
+        return pd.DataFrame(columns=combined_columns)
+
+    df['Balance'] = df['Balance'].str.replace(",", "").astype(float)
+    df['Amount'] = df['Balance'].diff()
+    return df[combined_columns]
+
+def link(final_df, start, opening_balance=None):
+    if opening_balance is not None:
+        column = final_df.columns.get_loc('Amount')
+        final_df.iat[start, column] = final_df['Balance'].iat[start] - opening_balance
+
+def combine(frames, opening_balance=None):
+    return incremental.join([prepare(df) for df in frames], link, opening_balance, columns=combined_columns)
+
+@timing.timed_run
 def run():
     #st.markdown("## 🏦 Bank PDF Processor")
     st.subheader("Bank PDF Processor")
@@ -30,116 +175,22 @@ def run():
         st.info("📂 Please upload PDF files to begin.")
         return
 
-    unwanted_phrases = [
-        "Opening balance",
-    "ﺍﻟﺘﺎﺭﻳﺦ",
-    "ﺍﻟﻤﻌﺎﻣﻠﺔ",
-    "ﺭﻗﻢ ﺍﻟﻤﺮﺟﻊ",
-    "ﻗﻴﻮﺩ",
-    "ﻗﻴﻮﺩ ﺩﺍﺋﻨﻪ",
-    "ﺍﻟﺮﺻﻴﺪ",
-    "page",
-    "The items and balance shown",
-    "of the statement date",
-    "All charges, terms and conditions",
-    "Please note that for foreign currency",
-    "verified. Report any discrepancies",
-    "accurate.",
-    "indicative only",
-    "ﺍﻟﺮﺟﺎﺀ ﺍﻟﺘﺄﻛﺪ ﻣﻦ ﺻﺤﺔ ﺍﻟﻤﻌﺎﻣﻼﺕ ﻭﺍﻟﻤﺒﺎﻟﻎ ﺍﻟﻤﺒﻴﻨﺔ ﻏﻰ ﻫﺬﺍ ﺍﻟﻜﺸﻒ",
-    "Closing balance",
-     "8 of 8",
-    ]
-
-    of_pattern = re.compile(r'\bof\s*\d+\b', re.IGNORECASE)
-    date_pattern = re.compile(r'\b\d{4}-\d{2}-\d{2}(?=\D)', re.IGNORECASE)
-    amount_pattern = re.compile(r'\b(?:\d{1,3}(?:,\d{3})*|\d+)\.\d{1,2}\b|\b0\b')
-    header_pattern = re.compile(
-        r'Date\s*Transaction\s*Reference\s*Number\s*Debit\s*Balance\s*Credit',
-        re.IGNORECASE
-    )
-
-    def extract_transactions(file):
-        transactions = []
-        current_transaction = []
-        current_date = ""
-        reader = PyPDF2.PdfReader(file)
-        for page in reader.pages:
-            text = page.extract_text()
-            if text:
-                lines = text.splitlines()
-                for line in lines:
-                    line = line.strip()
-                    line = header_pattern.sub('', line)
-
-                    if any(phrase in line for phrase in unwanted_phrases) or of_pattern.search(line):
-                        continue
-
-                    date_match = date_pattern.search(line)
-                    if date_match:
-                        if current_transaction:
-                            transactions.append((current_date, current_transaction))
-                            current_transaction = []
-                        current_date = date_match.group()
-                        current_transaction.append(line)
-                    else:
-                        current_transaction.append(line)
-
-        if current_transaction:
-            transactions.append((current_date, current_transaction))
-
-        return transactions
-
-    def parse_structured_data(transactions):
-        structured_data = []
-        for date, lines in transactions:
-            full_text = " ".join(lines).strip()
-            all_amounts = amount_pattern.findall(full_text)
-            balance = all_amounts[-1] if all_amounts else ""
-
-            if balance:
-                balance_index = full_text.rfind(balance)
-                description = (full_text[:balance_index] + full_text[balance_index + len(balance):]).strip()
-            else:
-                description = full_text
-
-            description = re.sub(r'\s+', ' ', description)
-
-            structured_data.append({
-                "Date": date,
-                "Description": description,
-                "Balance": balance
-            })
-        return structured_data
-
-    all_data = []
+    frames = []
     for file in uploaded_files:
         st.info(f"📄 Processing: {file.name}")
-        transactions = extract_transactions(file)
-        structured_data = parse_structured_data(transactions)
-        df = pd.DataFrame(structured_data)
-
-        df = df[
-            df['Date'].notna() &
-            df['Balance'].notna() &
-            (df['Date'].str.strip() != "") &
-            (df['Balance'].str.strip() != "")
-        ]
-
-        df['Balance'] = df['Balance'].str.replace(",", "").astype(float)
-        df['Amount'] = df['Balance'].diff()
-        df.loc[df.index[0], 'Amount'] = df.loc[df.index[0], 'Balance'] - opening_balance
-        df['Source_File'] = file.name
-        all_data.append(df)
-
-    final_df = pd.concat(all_data, ignore_index=True)
-    final_df.reset_index(drop=True, inplace=True)
+        frames.append(incremental.parse(file, __name__))
+
+    with timing.span("combine"):
+        final_df = incremental.combine(uploaded_files, frames, __name__, opening_balance=opening_balance)
+    if final_df is None:  # still parsing in the background
+        return
 
     st.success("✅ All PDFs processed successfully!")
-    st.dataframe(final_df)
+    with timing.span("render"):
+        st.dataframe(final_df)
 
-    csv = final_df.to_csv(index=False).encode("utf-8")
-    st.download_button("⬇️ Download CSV", csv, "all_statements_combined.csv", "text/csv")
+    export.download_button("⬇️ Download", final_df, "all_statements_combined", bank=__name__)
+    store.panel(uploaded_files, __name__, "all_statements_combined")
     
 
 # Only needed if you want this file to run standalone
@@ -0,0 +1,175 @@
+# ocr.py – OCR fallback for scanned pages in the text-based parsers
+#
+# Scanned statements have no text layer, so the text parsers (FAB, Rak,
+# Mashreq, ADIB, Wio) would silently return no rows for them. page_texts()
+# probes every page with PyMuPDF (about 0.1 ms a page on text statements).
+# Only pages with at least one image but (almost) no text are rasterized, in
+# grayscale at BANK_OCR_DPI (300 by default, Tesseract's preferred resolution
+# for small print), and passed through Tesseract. Parsers use the returned
+# text in place of the page's own extraction.
+#
+# Pages are OCR'd on page_pool's shared worker processes, in up to
+# BANK_OCR_WORKERS chunks (1 OCRs inline). Text is
+# cached per (file hash, page, DPI) in a small in-memory LRU and, when enabled,
+# in parse_cache's disk tier. BANK_OCR=0 turns the fallback off.
+#
+# Rasterizing uses PyMuPDF rather than pdf2image, so poppler is not needed;
+# pytesseract and the tesseract binary are only needed once a scanned page
+# actually turns up.
+
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures.process import BrokenProcessPool
+
+import page_pool
+import parse_cache
+import spool
+import timing
+
+ENABLED = os.environ.get("BANK_OCR", "1") != "0"
+DPI = int(os.environ.get("BANK_OCR_DPI", "300"))
+MAX_WORKERS = int(os.environ.get("BANK_OCR_WORKERS", str(os.cpu_count() or 1)))
+LANGUAGE = os.environ.get("BANK_OCR_LANG", "eng")
+MEMORY_MAX_PAGES = 512
+
+# A page needs OCR when its text layer has fewer characters than this
+MIN_TEXT_CHARS = 16
+# --psm 6: one uniform block of text, which keeps statement rows on one line each
+TESSERACT_CONFIG = "--psm 6"
+
+# Bump when OCR output changes so cached page text is invalidated
+OCR_VERSION = "1"
+
+logger = logging.getLogger(__name__)
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+_available = None
+
+
+def disable():
+    """OCR pages inline in this process (used by batch_convert's workers)."""
+    global MAX_WORKERS
+    MAX_WORKERS = 1
+
+
+def available():
+    """Whether pytesseract and the tesseract binary can be used (checked once)."""
+    global _available
+    if _available is None:
+        try:
+            import pytesseract
+            pytesseract.get_tesseract_version()
+            _available = True
+        except Exception:
+            _available = False
+    return _available
+
+
+# ==== Probe ====
+def scanned_pages(source):
+    """Return the 0-based indices of pages that have images but no usable text layer."""
+    with spool.open_pymupdf(source) as doc:
+        # get_images() only reads the page's resources, so text is extracted
+        # just for pages that carry an image at all
+        return [
+            index for index, page in enumerate(doc)
+            if page.get_images() and len(page.get_text("text").strip()) < MIN_TEXT_CHARS
+        ]
+
+
+# ==== OCR ====
+def _ocr_range(path, indices, dpi, language):
+    import fitz  # PyMuPDF
+    import pytesseract
+    from PIL import Image
+
+    texts = []
+    with fitz.open(path) as doc:
+        for index in indices:
+            pix = doc[index].get_pixmap(dpi=dpi, colorspace=fitz.csGRAY)
+            image = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+            texts.append(pytesseract.image_to_string(image, lang=language, config=TESSERACT_CONFIG))
+    return texts
+
+
+def _ocr_pages(file, indices):
+    """OCR the given pages, fanning them out to worker processes."""
+    # Workers re-open the document by path rather than receiving its bytes
+    with spool.local_path(file) as path:
+        workers = min(MAX_WORKERS, len(indices))
+        if workers <= 1:
+            return _ocr_range(path, indices, DPI, LANGUAGE)
+
+        chunk = max(1, -(-len(indices) // (workers * 2)))
+        chunks = [indices[start:start + chunk] for start in range(0, len(indices), chunk)]
+        pool = page_pool.executor()
+        try:
+            results = pool.map(_ocr_range, [path] * len(chunks), chunks,
+                               [DPI] * len(chunks), [LANGUAGE] * len(chunks))
+            return [text for texts in results for text in texts]
+        except BrokenProcessPool:
+            page_pool.discard(pool)
+            raise
+
+
+# ==== Cache ====
+def _key(digest, index):
+    return parse_cache.make_key(digest, f"ocr-p{index}", f"{OCR_VERSION}-{DPI}dpi-{LANGUAGE}")
+
+
+def _cache_get(key):
+    with _lock:
+        if key in _memory:
+            _memory.move_to_end(key)
+            return _memory[key]
+    # Page texts skip parse_cache's memory tier so they never evict parsed frames
+    value = parse_cache.lookup(key, memory=False)
+    if value is not None:
+        _cache_put(key, value, disk=False)
+    return value
+
+
+def _cache_put(key, value, disk=True):
+    with _lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_MAX_PAGES:
+            _memory.popitem(last=False)
+    if disk:
+        parse_cache.store(key, value, memory=False)
+
+
+# ==== Public API ====
+def page_texts(file):
+    """Return {page_index: OCR text} for the scanned pages of file; {} when there are none.
+
+    file may be an upload, a path or raw bytes.
+    """
+    if not ENABLED:
+        return {}
+
+    with timing.span("ocr_probe"):
+        indices = scanned_pages(file)
+    if not indices:
+        return {}
+    if not available():
+        logger.warning("%d scanned page(s) found but Tesseract is not available; they are skipped", len(indices))
+        return {}
+
+    digest = parse_cache.file_digest(file)
+    texts = {}
+    for index in indices:
+        text = _cache_get(_key(digest, index))
+        if text is not None:
+            texts[index] = text
+
+    missing = [index for index in indices if index not in texts]
+    if missing:
+        with timing.span("ocr"):
+            for index, text in zip(missing, _ocr_pages(file, missing)):
+                _cache_put(_key(digest, index), text)
+                texts[index] = text
+    return texts
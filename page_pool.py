@@ -0,0 +1,126 @@
+# page_pool.py – Page-level parallelism for the pdfplumber table parsers
+#
+# pdfplumber table detection is the slowest step on long statements, and each
+# page is independent of the others. imap_pages() splits a PDF into contiguous
+# page ranges, runs a per-page function over each range in worker processes,
+# and yields the per-page results in page order so callers can replay any
+# cross-page state (e.g. ADCB's header detection) serially as they arrive.
+# Given pages=, the indexes page_triage.select() kept, only those pages are
+# extracted; the others yield an empty list.
+#
+# BANK_PAGE_WORKERS caps the worker count (1 disables parallelism) and
+# BANK_PARALLEL_MIN_PAGES sets the page count below which pages run inline.
+#
+# The workers are one long-lived pool per process, shared by every file and by
+# ocr.py, so concurrent parses queue for the same BANK_PAGE_WORKERS processes
+# instead of starting a pool each. They are started by a forkserver, not
+# forked from the caller: parses run on background threads of the Streamlit
+# server (see jobs.py), and a child forked while another thread holds a lock
+# (logging, parse_cache) can deadlock on it.
+
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+import pdfplumber
+
+import spool
+import timing
+
+MAX_WORKERS = int(os.environ.get("BANK_PAGE_WORKERS", str(os.cpu_count() or 1)))
+PARALLEL_MIN_PAGES = int(os.environ.get("BANK_PARALLEL_MIN_PAGES", "24"))
+START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def disable():
+    """Run pages inline in this process (used by batch_convert's workers)."""
+    global MAX_WORKERS
+    MAX_WORKERS = 1
+
+
+def executor():
+    """The process-wide worker pool, started on first use."""
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ProcessPoolExecutor(max_workers=MAX_WORKERS,
+                                            mp_context=multiprocessing.get_context(START_METHOD))
+        return _executor
+
+
+def discard(pool):
+    """Forget pool after a worker died, so the next call starts a fresh one."""
+    global _executor
+    with _executor_lock:
+        if _executor is pool:
+            _executor = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _map_pages(path, page_fn, indexes):
+    # Stage spans inside page_fn are recorded here and merged into the parent's recorder
+    with timing.recording(timing.Timings(None)) as recorder:
+        with timing.span("open"):
+            pdf = pdfplumber.open(path)
+        with pdf:
+            results = [page_fn(pdf.pages[index]) for index in indexes]
+    return results, recorder.stages
+
+
+def _page_chunks(indexes, workers):
+    # A couple of chunks per worker evens out pages with very different densities
+    chunk = max(1, -(-len(indexes) // (workers * 2)))
+    return [indexes[start:start + chunk] for start in range(0, len(indexes), chunk)]
+
+
+def imap_pages(file, page_fn, pages=None):
+    """Yield (page_no, page_count, page_fn(page)) in page order, fanning pages out to processes.
+
+    page_fn must be a module-level function so it can be pickled. pages, if
+    given, are the 0-based indexes to extract; every other page yields [].
+    """
+    with timing.span("open"):
+        pdf = pdfplumber.open(file)
+    with pdf:
+        page_count = len(pdf.pages)
+        wanted = list(range(page_count)) if pages is None else sorted(set(pages))
+        workers = min(MAX_WORKERS, len(wanted))
+        if workers <= 1 or len(wanted) < PARALLEL_MIN_PAGES:
+            keep = set(wanted)
+            for page_no, page in enumerate(pdf.pages, 1):
+                if page_no - 1 not in keep:
+                    yield page_no, page_count, []
+                    continue
+                yield page_no, page_count, page_fn(page)
+                page.close()  # release the page's parsed objects as we go
+            return
+
+    # Workers re-open the document by path rather than receiving its bytes
+    with spool.local_path(file) as path:
+        chunks = _page_chunks(wanted, workers)
+        pool = executor()
+        try:
+            results = pool.map(_map_pages, [path] * len(chunks), [page_fn] * len(chunks), chunks)
+            recorder = timing.current()
+            page_no = 0
+            for indexes, (chunk, stages) in zip(chunks, results):
+                if recorder is not None:
+                    recorder.merge(stages)
+                for index, result in zip(indexes, chunk):
+                    while page_no < index:  # skipped pages before this one
+                        page_no += 1
+                        yield page_no, page_count, []
+                    page_no += 1
+                    yield page_no, page_count, result
+            while page_no < page_count:
+                page_no += 1
+                yield page_no, page_count, []
+        except BrokenProcessPool:
+            discard(pool)
+            raise
+
@@ -0,0 +1,88 @@
+# page_text.py – Page text from PyMuPDF, pdfplumber or PyPDF2 behind one interface
+#
+# The text parsers used to hard-wire a library each: FAB and Mashreq read
+# PyPDF2's extract_text(), Wio pdfplumber's, Rak and ADIB PyMuPDF's get_text().
+# iter_texts(file, backend) yields every page's text from any of the three,
+# with the OCR fallback (ocr.py) already applied to scanned pages, and
+# iter_lines() splits it into normalized lines: stripped, blanks dropped.
+#
+# PyMuPDF is several times faster than the other two (see
+# benchmarks/text_backends.py, which also checks that each bank's output is
+# unchanged when it switches backend), but get_text() puts every text run on
+# its own line where the others join a table row. Each bank therefore keeps
+# the library it was written against as its default (PyPDF2 for FAB and
+# Mashreq, pdfplumber for Wio) until real statements give identical output
+# under benchmarks/text_backends.py --pdf with pymupdf; a module's
+# <BANK>_TEXT_BACKEND environment variable selects another.
+
+import timing
+import ocr
+import spool
+
+BACKENDS = ["pymupdf", "pdfplumber", "pypdf2"]
+
+
+# ==== Backends: yield (page_count, text) per page, skipping pages in `skip` ====
+def _pymupdf(source, skip):
+    with timing.span("open"):
+        doc = spool.open_pymupdf(source)
+    with doc:
+        page_count = doc.page_count
+        for index, page in enumerate(doc):
+            text = None
+            if index not in skip:
+                with timing.span("extract_text"):
+                    text = page.get_text("text")
+            yield page_count, text
+
+
+def _pdfplumber(source, skip):
+    import pdfplumber
+
+    with timing.span("open"):
+        pdf = pdfplumber.open(spool.path_of(source) or source)
+    with pdf:
+        page_count = len(pdf.pages)
+        for index, page in enumerate(pdf.pages):
+            text = None
+            if index not in skip:
+                with timing.span("extract_text"):
+                    text = page.extract_text() or ""
+            page.close()  # release the page's parsed objects as we go
+            yield page_count, text
+
+
+def _pypdf2(source, skip):
+    import PyPDF2
+
+    with spool.binary_stream(source) as stream:
+        with timing.span("open"):
+            reader = PyPDF2.PdfReader(stream)
+        page_count = len(reader.pages)
+        for index, page in enumerate(reader.pages):
+            text = None
+            if index not in skip:
+                with timing.span("extract_text"):
+                    text = page.extract_text() or ""
+            yield page_count, text
+
+
+_backends = {"pymupdf": _pymupdf, "pdfplumber": _pdfplumber, "pypdf2": _pypdf2}
+
+
+# ==== Public API ====
+def iter_texts(file, backend="pymupdf"):
+    """Yield (page_no, page_count, text) for every page, OCR text for scanned ones."""
+    ocr_texts = ocr.page_texts(file)
+    for page_no, (page_count, text) in enumerate(_backends[backend](file, ocr_texts), 1):
+        yield page_no, page_count, text if text is not None else ocr_texts[page_no - 1]
+
+
+def normalize_lines(text):
+    return [line for line in (raw.strip() for raw in text.splitlines()) if line]
+
+
+def iter_lines(file, backend="pymupdf"):
+    """Yield (page_no, page_count, lines) with each page's normalized lines."""
+    for page_no, page_count, text in iter_texts(file, backend):
+        yield page_no, page_count, normalize_lines(text)
@@ -0,0 +1,78 @@
+# page_triage.py – Skip cover, T&C and summary pages before the expensive extraction
+#
+# The pdfplumber table parsers (adcb, emirates_islamic_bank, al_jazira_bank)
+# ran table detection on every page, a few hundred milliseconds each, and
+# statements open with cover and summary pages and close with terms and
+# conditions. select() first reads each page's text with PyMuPDF, a few
+# milliseconds a page, and keeps only pages that look like transaction pages
+# to its bank's PageProbe: a header marker on the page, or at least
+# min_dated_lines lines that start with a date. Pages without a text layer are
+# kept, since the probe cannot judge them. page_pool.imap_pages(file, fn,
+# pages=...) then runs the extractor on the kept pages only.
+#
+# Text parsers already have the page text, so they call keep(lines, probe)
+# per page instead (Rak_Bank), passing continues=True when the page may carry
+# on a transaction left open by the previous one. Both count "pages_parsed" and "pages_skipped"
+# on the file's timings (see timing.py). BANK_PAGE_TRIAGE=0 parses every page.
+
+import os
+import re
+
+import spool
+import timing
+
+ENABLED = os.environ.get("BANK_PAGE_TRIAGE", "1") != "0"
+
+# Arabic-Indic digits are probed as Western ones (Al Jazira prints both)
+_western_digits = str.maketrans("٠١٢٣٤٥٦٧٨٩", "0123456789")
+
+
+class PageProbe:
+    """What a transaction page of one bank looks like in its plain text."""
+
+    __slots__ = ("date_pattern", "markers", "min_dated_lines")
+
+    def __init__(self, date_pattern, markers=(), min_dated_lines=1):
+        self.date_pattern = re.compile(date_pattern) if isinstance(date_pattern, str) else date_pattern
+        self.markers = tuple(markers)
+        self.min_dated_lines = min_dated_lines
+
+    def matches(self, lines):
+        dated = 0
+        for line in lines:
+            if any(marker in line for marker in self.markers):
+                return True
+            if self.date_pattern.match(line.strip().translate(_western_digits)):
+                dated += 1
+                if dated >= self.min_dated_lines:
+                    return True
+        return False
+
+
+def keep(lines, probe, continues=False):
+    """Whether a page with these text lines should be parsed; counted either way.
+
+    A page that continues an open transaction is parsed even if it does not match.
+    """
+    if not ENABLED or continues or probe.matches(lines):
+        timing.count("pages_parsed")
+        return True
+    timing.count("pages_skipped")
+    return False
+
+
+def select(file, probe):
+    """0-based indexes of file's pages worth extracting, or None to extract every page."""
+    if not ENABLED:
+        return None
+    with timing.span("triage"):
+        with spool.open_pymupdf(file) as doc:
+            page_count = doc.page_count
+            pages = []
+            for index, page in enumerate(doc):
+                text = page.get_text("text")
+                if not text.strip() or probe.matches(text.splitlines()):
+                    pages.append(index)
+    timing.count("pages_parsed", len(pages))
+    timing.count("pages_skipped", page_count - len(pages))
+    return pages
@@ -0,0 +1,188 @@
+# parse_cache.py – Content-hash cache for parsed statement results
+#
+# Streamlit re-executes the whole script on every widget interaction, so each
+# bank module's run() would otherwise re-parse every uploaded PDF. Results are
+# keyed by the SHA-256 of the file bytes plus the bank module and its parser
+# version, kept in an in-memory LRU and, optionally, in an on-disk tier.
+#
+# Each module's PARSER_VERSION is bumped whenever its parsing output changes,
+# so results cached by the old code are not served. Modules with a selectable
+# text backend (page_text.py) append it, e.g. "4-pymupdf", so results from one
+# backend are never served for another.
+#
+# Disk tier is enabled by setting BANK_PARSE_CACHE_DIR; its size is capped by
+# BANK_PARSE_CACHE_MAX_MB (default 512), evicting least recently used entries.
+
+import copy
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+from collections import OrderedDict
+
+import timing
+
+MEMORY_MAX_ENTRIES = int(os.environ.get("BANK_PARSE_CACHE_MAX_ENTRIES", "64"))
+DISK_DIR = os.environ.get("BANK_PARSE_CACHE_DIR", "")
+DISK_MAX_BYTES = int(float(os.environ.get("BANK_PARSE_CACHE_MAX_MB", "512")) * 1024 * 1024)
+
+_memory = OrderedDict()
+_lock = threading.Lock()
+
+
+# ==== Keys ====
+def read_bytes(file):
+    """Return the full contents of an uploaded file, path or raw bytes."""
+    if isinstance(file, (bytes, bytearray)):
+        return bytes(file)
+    if isinstance(file, (str, os.PathLike)):
+        with open(file, "rb") as fh:
+            return fh.read()
+    if hasattr(file, "getvalue"):
+        return file.getvalue()
+    pos = file.tell()
+    file.seek(0)
+    data = file.read()
+    file.seek(pos)
+    return data
+
+
+def file_digest(file):
+    if isinstance(file, (str, os.PathLike)):
+        # Spooled and on-disk statements are hashed without reading them whole
+        digest = hashlib.sha256()
+        with open(file, "rb") as fh:
+            for block in iter(lambda: fh.read(1024 * 1024), b""):
+                digest.update(block)
+        return digest.hexdigest()
+    return hashlib.sha256(read_bytes(file)).hexdigest()
+
+
+def make_key(digest, namespace, version, filename=""):
+    # Parsers stamp the upload name into their rows, so it is part of the key
+    name_digest = hashlib.sha256(filename.encode("utf-8")).hexdigest()[:16]
+    return f"{namespace}-{version}-{digest}-{name_digest}"
+
+
+# ==== Memory tier ====
+def _memory_get(key):
+    with _lock:
+        if key not in _memory:
+            return None
+        _memory.move_to_end(key)
+        return _memory[key]
+
+
+def _memory_put(key, value):
+    with _lock:
+        _memory[key] = value
+        _memory.move_to_end(key)
+        while len(_memory) > MEMORY_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+# ==== Disk tier ====
+def _disk_path(key):
+    return os.path.join(DISK_DIR, key + ".pkl")
+
+
+def _disk_get(key):
+    if not DISK_DIR:
+        return None
+    path = _disk_path(key)
+    try:
+        with open(path, "rb") as fh:
+            value = pickle.load(fh)
+    except (OSError, pickle.UnpicklingError, EOFError):
+        return None
+    try:
+        os.utime(path)  # mark as recently used for eviction
+    except OSError:
+        pass
+    return value
+
+
+def _disk_put(key, value):
+    if not DISK_DIR:
+        return
+    os.makedirs(DISK_DIR, exist_ok=True)
+    # Write to a temp file first so concurrent readers never see a partial pickle
+    fd, tmp_path = tempfile.mkstemp(dir=DISK_DIR, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as fh:
+            pickle.dump(value, fh, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, _disk_path(key))
+    except OSError:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return
+    _disk_evict()
+
+
+def _disk_evict():
+    entries = []
+    total = 0
+    for name in os.listdir(DISK_DIR):
+        if not name.endswith(".pkl"):
+            continue
+        path = os.path.join(DISK_DIR, name)
+        try:
+            stat = os.stat(path)
+        except OSError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+        total += stat.st_size
+
+    entries.sort()
+    for _, size, path in entries:
+        if total <= DISK_MAX_BYTES:
+            break
+        try:
+            os.remove(path)
+            total -= size
+        except OSError:
+            pass
+
+
+# ==== Public API ====
+def cached_parse(file, namespace, version, parse_fn):
+    """Return parse_fn(file), reusing an earlier result for identical bytes.
+
+    Values handed back are copies, so callers may mutate them freely.
+    """
+    with timing.span("hash"):
+        key = make_key(file_digest(file), namespace, version, getattr(file, "name", ""))
+
+    value = lookup(key)
+    if value is None:
+        if hasattr(file, "seek"):
+            file.seek(0)
+        value = parse_fn(file)
+        store(key, value)
+
+    with timing.span("copy"):
+        return copy.deepcopy(value)
+
+
+def lookup(key, memory=True):
+    """Return the value stored under key, or None; memory=False skips the in-memory tier."""
+    value = _memory_get(key) if memory else None
+    if value is None:
+        with timing.span("disk_cache"):
+            value = _disk_get(key)
+        if value is not None and memory:
+            _memory_put(key, value)
+    return value
+
+
+def store(key, value, memory=True):
+    with timing.span("disk_cache"):
+        _disk_put(key, value)
+    if memory:
+        _memory_put(key, value)
+
+
+def clear():
+    with _lock:
+        _memory.clear()
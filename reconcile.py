@@ -0,0 +1,146 @@
+# reconcile.py – Running-balance check on every parsed statement
+#
+# A misread amount used to go unnoticed: Rak_Bank tells deposits from
+# withdrawals by keywords, fab_bank takes the first two figures of a
+# description as amount and balance, and a wrapped row can lose its amount
+# altogether. check() tests every row of a parsed file against the one before
+# it, previous balance ± amount == balance, and returns the rows where that
+# fails ("breaks") with the page each came from. It works on whole NumPy
+# columns in integer fils, so streaming.parse runs it on every parse; it costs
+# well under a second per million rows (see benchmarks/reconcile.py).
+#
+# The values are found through the bank module's column map (`fields`, see
+# schema.py): "balance" and either "amount", "unsigned" (FAB, printed without
+# a sign) or "debit"/"credit"; "account" when one file holds several accounts
+# (checked separately), and "date"/"description" to show with each break.
+# Rows without a balance are not checked; their amounts count towards the
+# next row that has one. Statements printed newest first are recognised by
+# which direction has fewer breaks. Banks whose map has no amount (Mashreq
+# prints none) are not checked.
+
+import numpy as np
+import pandas as pd
+
+import schema
+
+# Bump when the check changes so cached reports are recomputed
+VERSION = "1"
+
+BREAK_COLUMNS = ["Row", "Page", "Previous balance", "Amount", "Expected balance", "Balance", "Difference"]
+
+
+class Reconciliation:
+    """One file's balance check: rows checked and the breaks found."""
+
+    __slots__ = ("checked", "breaks")
+
+    def __init__(self, checked, breaks):
+        self.checked = checked
+        self.breaks = breaks
+
+    @property
+    def ok(self):
+        return self.breaks.empty
+
+
+# ==== Check ====
+def _fils(values):
+    """(int64 fils, valid mask) for a column of numbers or strings with thousands separators."""
+    values = schema.numbers(values)
+    valid = ~np.isnan(values)
+    return np.round(np.where(valid, values, 0.0) * 100).astype(np.int64), valid
+
+
+def check(df, fields, pages=None):
+    """Reconciliation of df's running balance, or None when fields names no amount.
+
+    pages, if given, holds the source page of each row of df.
+    """
+    if fields is None or not {"amount", "unsigned", "debit"} & fields.keys():
+        return None
+    balance, has_balance = _fils(df[fields["balance"]])
+    if "amount" in fields or "unsigned" in fields:
+        amount, _ = _fils(df[fields.get("amount", fields.get("unsigned"))])
+    else:
+        credit, _ = _fils(df[fields["credit"]])
+        debit, _ = _fils(df[fields["debit"]])
+        amount = credit - debit
+    unsigned = "unsigned" in fields
+
+    # Several accounts in one file are checked one after another, each in file order
+    if "account" in fields:
+        group = pd.factorize(df[fields["account"]])[0]
+        order = np.argsort(group, kind="stable")
+        group, balance, has_balance, amount = group[order], balance[order], has_balance[order], amount[order]
+    else:
+        group = np.zeros(len(df), dtype=np.int64)
+        order = np.arange(len(df))
+
+    # Consecutive rows with a balance; amounts of rows between them count too
+    rows = np.flatnonzero(has_balance)
+    before, after = rows[:-1], rows[1:]
+    paired = group[before] == group[after]
+    before, after = before[paired], after[paired]
+    moved = np.concatenate(([0], np.cumsum(amount)))
+    delta = balance[after] - balance[before]
+    forward = moved[after + 1] - moved[before + 1]   # oldest first: amounts after `before` up to `after`
+    backward = moved[after] - moved[before]          # newest first: amounts from `before` up to `after`
+    if unsigned:
+        forward_bad = np.abs(delta) != forward
+        backward_bad = np.abs(delta) != backward
+    else:
+        forward_bad = delta != forward
+        backward_bad = -delta != backward
+
+    if backward_bad.sum() < forward_bad.sum():
+        bad = np.flatnonzero(backward_bad)
+        row, previous, moved_by = before[bad], balance[after[bad]], backward[bad]
+        expected = previous + (np.sign(-delta[bad]) * moved_by if unsigned else moved_by)
+    else:
+        bad = np.flatnonzero(forward_bad)
+        row, previous, moved_by = after[bad], balance[before[bad]], forward[bad]
+        expected = previous + (np.sign(delta[bad]) * moved_by if unsigned else moved_by)
+
+    position = order[row]
+    breaks = pd.DataFrame({
+        "Row": position + 1,
+        "Page": np.asarray(pages)[position] if pages is not None else pd.NA,
+        "Previous balance": previous / 100,
+        "Amount": moved_by / 100,
+        "Expected balance": expected / 100,
+        "Balance": balance[row] / 100,
+        "Difference": (balance[row] - expected) / 100,
+    }, columns=BREAK_COLUMNS)
+    for key in ("description", "date", "account"):
+        if key in fields:
+            column = fields[key][0] if key == "date" else fields[key]
+            breaks.insert(2, column, df[column].to_numpy()[position])
+    return Reconciliation(len(before), breaks)
+
+
+# ==== Streamlit UI ====
+def panel(files, bank, namespace=None):
+    """Summary of the uploaded files' balance checks, with any breaks by file and page."""
+    import streamlit as st
+
+    import incremental
+
+    reports = [(name, report) for name, report in incremental.reports(files, bank, namespace) if report is not None]
+    if not reports:
+        return
+    checked = sum(report.checked for _, report in reports)
+    broken = [(name, report) for name, report in reports if not report.ok]
+    if not broken:
+        st.caption(f"✅ Running balance reconciles across {checked} row(s).")
+        return
+
+    count = sum(len(report.breaks) for _, report in broken)
+    st.warning(f"⚠️ {count} running-balance break(s) in {len(broken)} file(s): "
+               "the balance does not follow from the previous balance and the amount.")
+    frames = []
+    for name, report in broken:
+        frame = report.breaks.copy()
+        frame.insert(0, "File", name)
+        frames.append(frame)
+    with st.expander("Balance breaks"):
+        st.dataframe(pd.concat(frames, ignore_index=True), hide_index=True)
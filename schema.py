@@ -0,0 +1,110 @@
+# schema.py – Compact typed form of a bank's combined frame
+#
+# Parsers emit dates as the bank prints them ("01 Jan 2024", "01/01/2024",
+# "2024-01-01"), money as float64 or as strings with thousands separators, and
+# repeat the file name, account and currency on every row. typed(df, bank)
+# converts a combined frame column by column, keeping the bank's column names
+# and order:
+#
+#   dates          datetime64, parsed once with the bank's explicit format
+#   money          Int64 in fils (minor units), so sums and joins are exact
+#   categories     category (file names, accounts, currencies)
+#
+# Each bank module describes its frame in one column map, `fields`, which
+# store.py and reconcile.py read as well:
+#
+#   fields = {"date": ("Date", "%d %b %Y"), "value_date": ("Value Date", "%d %b %Y"),
+#             "amount": "Amount", "balance": "Balance", "description": "Description",
+#             "source": "Source File"}
+#
+# with "unsigned" for an amount printed without a sign, "debit"/"credit" where
+# the bank prints two columns, "account" and "currency" where the statement
+# carries them, and "other_money" for further money columns that are typed but
+# are not the transaction amount.
+#
+# Conversion happens only on export: Parquet and Arrow downloads and
+# batch_convert's Parquet and Arrow output (see export.py). The frames the
+# parsers return, the table on screen, CSV, the store and the balance check
+# keep the parsed columns, so users see dates and amounts as printed.
+#
+# Money columns of a typed frame are named in df.attrs["fils"]; export.py
+# writes them back as decimals to CSV and tags them in Parquet and Arrow
+# files. Values that do not parse become NaT / <NA>. On 1M-row synthetic
+# consolidations this uses 1.1-1.8x less memory than the parsed frame (whose
+# text is already Arrow-backed) and joins on date and balance 1.3-2x faster
+# (see benchmarks/typed_schema.py).
+
+import importlib
+
+import numpy as np
+import pandas as pd
+
+FILS_ATTR = "fils"
+
+
+# ==== Conversions ====
+def numbers(values):
+    """Float64 array, NaN where not a number, for a column of numbers or strings like " 1,234.50"."""
+    if values.dtype != object and not pd.api.types.is_string_dtype(values):
+        return pd.to_numeric(values, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+    try:
+        import pyarrow as pa
+        import pyarrow.compute as pc
+    except ImportError:
+        cleaned = values.astype("string").str.replace(",", "", regex=False).str.strip()
+        return pd.to_numeric(cleaned, errors="coerce").to_numpy(dtype="float64", na_value=np.nan)
+
+    # Arrow's cast is ~15x faster than pd.to_numeric but rejects the whole column
+    # over one non-number, so on failure those are nulled first (blank cells,
+    # common in debit/credit columns, up front)
+    text = pc.utf8_trim_whitespace(pc.replace_substring(pa.array(values.astype("string[pyarrow]")), ",", ""))
+    text = pc.if_else(pc.equal(text, ""), None, text)
+    try:
+        parsed = pc.cast(text, pa.float64())
+    except pa.ArrowInvalid:
+        text = pc.if_else(pc.match_substring_regex(text, r"^-?(\d+\.?\d*|\.\d+)$"), text, None)
+        parsed = pc.cast(text, pa.float64())
+    return parsed.to_numpy(zero_copy_only=False)
+
+
+def to_fils(values):
+    """Column of amounts as nullable Int64 fils."""
+    parsed = numbers(values)
+    valid = ~np.isnan(parsed)
+    fils = np.round(np.where(valid, parsed, 0.0) * 100).astype(np.int64)
+    return pd.Series(pd.arrays.IntegerArray(fils, ~valid), index=values.index)
+
+
+def from_fils(values):
+    """Inverse of to_fils(): float64 amounts, NaN for <NA>."""
+    return values.astype("Float64").to_numpy(dtype="float64", na_value=np.nan) / 100
+
+
+# ==== Public API ====
+def typed(df, bank):
+    """Copy of bank's combined frame df with the columns of its `fields` map typed."""
+    fields = (importlib.import_module(bank) if isinstance(bank, str) else bank).fields
+    out = df.copy()
+    for key in ("date", "value_date"):
+        column, date_format = fields.get(key, (None, None))
+        if column in out.columns and not pd.api.types.is_datetime64_any_dtype(out[column]):
+            out[column] = pd.to_datetime(out[column], format=date_format, errors="coerce")
+    money = [fields[key] for key in ("amount", "unsigned", "debit", "credit", "balance") if key in fields]
+    money = [column for column in money + fields.get("other_money", []) if column in out.columns]
+    for column in money:
+        out[column] = to_fils(out[column])
+    for key in ("source", "account", "currency"):
+        if fields.get(key) in out.columns:
+            out[fields[key]] = out[fields[key]].astype("category")
+    out.attrs[FILS_ATTR] = money
+    return out
+
+
+def plain(df):
+    """df with any fils columns (a typed() frame's) turned back into decimal amounts."""
+    fils = df.attrs.get(FILS_ATTR)
+    if not fils:
+        return df
+    out = df.assign(**{column: from_fils(df[column]) for column in fils})
+    out.attrs = {}
+    return out
@@ -0,0 +1,107 @@
+# spool.py – Open statements from disk instead of holding extra copies in RAM
+#
+# Streamlit keeps every upload in memory, and parsers used to make more copies
+# of it (pdf_file.read() or getvalue() for PyMuPDF's stream=, buffers held by
+# PyPDF2/pdfplumber readers). spooled() copies an upload larger than
+# BANK_SPOOL_MIN_MB (default 8) to a temp file once, in chunks, and yields its
+# path; smaller uploads are passed through unchanged. The temp file is removed
+# as soon as the parse that asked for it completes.
+#
+# Parsers then open whatever they were given through these helpers:
+#   open_pymupdf(source)  PyMuPDF document, read lazily from a path
+#   binary_stream(source) a read-only mmap of a path for PyPDF2, which would
+#                         otherwise read a whole path into a BytesIO
+# pdfplumber already reads lazily when given a path.
+
+import io
+import mmap
+import os
+import shutil
+import tempfile
+from contextlib import contextmanager
+
+import parse_cache
+
+SPOOL_MIN_BYTES = int(float(os.environ.get("BANK_SPOOL_MIN_MB", "8")) * 1024 * 1024)
+COPY_CHUNK_BYTES = 1024 * 1024
+
+
+def path_of(file):
+    """Return the filesystem path behind file, or None for in-memory uploads and bytes."""
+    if isinstance(file, (str, os.PathLike)):
+        return file
+    if isinstance(file, (io.BufferedReader, io.FileIO)) and os.path.isfile(file.name):
+        return file.name
+    return None
+
+
+def size_of(file):
+    path = path_of(file)
+    if path is not None:
+        return os.path.getsize(path)
+    if isinstance(file, (bytes, bytearray)):
+        return len(file)
+    if hasattr(file, "size"):  # Streamlit UploadedFile
+        return file.size
+    if hasattr(file, "seek"):
+        # Not getbuffer(): it copies a BytesIO still sharing the bytes it was built from
+        pos = file.tell()
+        size = file.seek(0, os.SEEK_END)
+        file.seek(pos)
+        return size
+    return 0
+
+
+def _copy_to_temp(file):
+    if hasattr(file, "seek"):
+        file.seek(0)
+    with tempfile.NamedTemporaryFile(suffix=".pdf", delete=False) as tmp:
+        if isinstance(file, (bytes, bytearray)):
+            tmp.write(file)
+        else:
+            shutil.copyfileobj(file, tmp, COPY_CHUNK_BYTES)
+    if hasattr(file, "seek"):
+        file.seek(0)
+    return tmp.name
+
+
+@contextmanager
+def spooled(file, min_bytes=None):
+    """Yield a path for large in-memory uploads (removed on exit), otherwise file itself."""
+    threshold = SPOOL_MIN_BYTES if min_bytes is None else min_bytes
+    if path_of(file) is not None or size_of(file) < threshold:
+        yield path_of(file) or file
+        return
+
+    path = _copy_to_temp(file)
+    try:
+        yield path
+    finally:
+        os.remove(path)
+
+
+@contextmanager
+def local_path(file):
+    """Yield a filesystem path for file, spooling it whatever its size (for worker processes)."""
+    with spooled(file, min_bytes=0) as path:
+        yield path
+
+
+def open_pymupdf(source):
+    import fitz  # PyMuPDF
+
+    path = path_of(source)
+    if path is not None:
+        return fitz.open(path)
+    return fitz.open(stream=parse_cache.read_bytes(source), filetype="pdf")
+
+
+@contextmanager
+def binary_stream(source):
+    """Yield a seekable binary stream for PyPDF2: an mmap for paths, else source itself."""
+    path = path_of(source)
+    if path is None or os.path.getsize(path) == 0:
+        yield source
+        return
+    with open(path, "rb") as fh, mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        yield mapped
@@ -0,0 +1,233 @@
+# store.py – Local SQLite store of parsed transactions, deduplicated across statements
+#
+# Overlapping monthly and quarterly statements for one account used to be
+# combined as they came, and the only dedup was emirates_islamic_bank's
+# per-batch drop_duplicates on the balance. ingest() writes combined rows to a
+# SQLite database instead, one row per transaction with a fingerprint of its
+# normalized date (ISO), amount and balance (both in fils). A unique index on
+# (bank, account, fingerprint, occurrence) makes INSERT OR IGNORE skip rows
+# already stored with a single index probe each; occurrence numbers rows that
+# share a fingerprint within one statement, so genuine repeats are kept, which
+# is why save() ingests each statement on its own, through the bank's own
+# combine() so derived columns (dates, merged rows) are in place. A second
+# index on (bank, account, date) serves query()'s date ranges, and query()
+# rebuilds the bank's own columns from each row's JSON copy for export.
+#
+# The values are found through the bank module's column map (`fields`, see
+# schema.py): "date" with its format, "balance", the amount from "amount" or
+# "unsigned" (or credit − debit where the bank prints two columns), and
+# "description", "source" and "account" where the statement has them. Rows
+# without a date or balance cannot be fingerprinted and are not stored.
+#
+# Where the statement carries the account (an "account" column, e.g. Wio),
+# rows are stored under the number printed on it, and the panel lists the
+# accounts actually stored instead of asking for one; otherwise every row of a
+# save goes under the account the user types.
+#
+# Statements are personal data, so the store is off unless BANK_STORE_PATH
+# names the database file.
+
+import datetime
+import importlib
+import json
+import os
+import sqlite3
+
+import pandas as pd
+
+import export
+import schema
+
+PATH = os.environ.get("BANK_STORE_PATH", "")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transactions (
+    id INTEGER PRIMARY KEY,
+    bank TEXT NOT NULL,
+    account TEXT NOT NULL,
+    date TEXT NOT NULL,
+    amount INTEGER,
+    balance INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    occurrence INTEGER NOT NULL,
+    description TEXT,
+    source_file TEXT,
+    row TEXT NOT NULL,
+    added_at TEXT NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS transactions_fingerprint
+    ON transactions (bank, account, fingerprint, occurrence);
+CREATE INDEX IF NOT EXISTS transactions_date
+    ON transactions (bank, account, date);
+"""
+
+
+def enabled():
+    return bool(PATH)
+
+
+def connect(path=None):
+    conn = sqlite3.connect(path or PATH, timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+# ==== Normalization ====
+def _column(df, name):
+    return df[name] if name in df.columns else pd.Series(pd.NA, index=df.index)
+
+
+def normalize(df, fields, account=""):
+    """Return df's fingerprint columns (date, amount, balance, ...) for rows that have a date and balance."""
+    date_column, date_format = fields["date"]
+    dates = _column(df, date_column)
+    if not pd.api.types.is_datetime64_any_dtype(dates):
+        dates = pd.to_datetime(dates, format=date_format, errors="coerce")
+
+    if "amount" in fields or "unsigned" in fields:
+        amount = schema.to_fils(_column(df, fields.get("amount", fields.get("unsigned"))))
+    elif "debit" in fields:
+        credit = schema.to_fils(_column(df, fields["credit"])).fillna(0)
+        amount = credit - schema.to_fils(_column(df, fields["debit"])).fillna(0)
+    else:
+        amount = pd.Series(pd.NA, index=df.index, dtype="Int64")
+
+    if "account" in fields:
+        accounts = _column(df, fields["account"]).astype("string").fillna(account)
+    else:
+        accounts = pd.Series(account, index=df.index, dtype="string")
+
+    out = pd.DataFrame({
+        "account": accounts,
+        "date": dates.dt.strftime("%Y-%m-%d"),
+        "amount": amount,
+        "balance": schema.to_fils(_column(df, fields["balance"])),
+        "description": _column(df, fields.get("description", "")).astype("string"),
+        "source_file": _column(df, fields.get("source", "")).astype("string"),
+    }, index=df.index)
+    out = out[out["date"].notna() & out["balance"].notna()]
+
+    out["fingerprint"] = out["date"] + "|" + out["amount"].astype("string").fillna("") + "|" + out["balance"].astype("string")
+    out["occurrence"] = out.groupby(["account", "fingerprint"]).cumcount()
+    return out
+
+
+def _values(series):
+    """Column as a list of Python values with None for missing, ready for sqlite3."""
+    return series.astype(object).where(series.notna(), None).tolist()
+
+
+# ==== Public API ====
+def ingest(df, bank, fields, account="", path=None):
+    """Store one statement's rows for bank; returns (added, duplicates, skipped) row counts."""
+    keys = normalize(df, fields, account)
+    # One JSON object per line; to_json escapes newlines inside values
+    payloads = df.loc[keys.index].to_json(
+        orient="records", lines=True, date_format="iso", double_precision=15
+    ).rstrip("\n").split("\n")
+    added_at = datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds")
+
+    columns = [_values(keys[name]) for name in
+               ("account", "date", "amount", "balance", "fingerprint", "occurrence", "description", "source_file")]
+    records = [
+        (bank, *values, payload, added_at)
+        for *values, payload in zip(*columns, payloads)
+    ]
+    with connect(path) as conn:
+        before = conn.total_changes
+        conn.executemany(
+            "INSERT OR IGNORE INTO transactions (bank, account, date, amount, balance, fingerprint,"
+            " occurrence, description, source_file, row, added_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            records
+        )
+        added = conn.total_changes - before
+    conn.close()
+    return added, len(records) - added, len(df) - len(records)
+
+
+def save(frames, bank, account="", path=None):
+    """ingest() each parsed statement (a per-file frame) of bank; returns the summed counts."""
+    module = importlib.import_module(bank)
+    totals = [0, 0, 0]
+    for frame in frames:
+        counts = ingest(module.combine([frame]), bank, module.fields, account, path)
+        totals = [total + count for total, count in zip(totals, counts)]
+    return tuple(totals)
+
+
+def query(bank, account=None, start=None, end=None, path=None):
+    """Return stored rows for bank (optionally one account, dates start..end inclusive) in its own columns."""
+    sql = "SELECT row FROM transactions WHERE bank = ?"
+    params = [bank]
+    if account is not None:
+        sql += " AND account = ?"
+        params.append(account)
+    if start is not None:
+        sql += " AND date >= ?"
+        params.append(str(start))
+    if end is not None:
+        sql += " AND date <= ?"
+        params.append(str(end))
+    sql += " ORDER BY date, id"
+
+    conn = connect(path)
+    try:
+        return pd.DataFrame.from_records([json.loads(row) for row, in conn.execute(sql, params)])
+    finally:
+        conn.close()
+
+
+def accounts(bank, path=None):
+    """Return [(account, rows, first date, last date)] stored for bank."""
+    conn = connect(path)
+    try:
+        return conn.execute(
+            "SELECT account, COUNT(*), MIN(date), MAX(date) FROM transactions"
+            " WHERE bank = ? GROUP BY account ORDER BY account", (bank,)
+        ).fetchall()
+    finally:
+        conn.close()
+
+
+# ==== Streamlit UI ====
+def panel(files, bank, file_stem, namespace=None, key=None):
+    """Save the uploaded statements under an account and download that account's stored history."""
+    if not enabled():
+        return
+
+    import streamlit as st
+
+    import incremental
+
+    key = key or file_stem
+    carried = "account" in importlib.import_module(bank).fields
+    with st.expander("🗄️ Transaction store"):
+        if carried:
+            account = ""
+            st.caption("Transactions are saved under the account numbers printed on the statements.")
+        else:
+            account = st.text_input("Account", key=f"{key}-store-account",
+                                    help="Statements saved under the same account are deduplicated against each other")
+        if st.button("Save to store", key=f"{key}-store-save"):
+            # Every file is parsed by now, so this only reads the session's results
+            frames = [incremental.parse(file, bank, namespace) for file in files]
+            added, duplicates, skipped = save(frames, bank, account)
+            st.success(f"Saved {added} new transaction(s); {duplicates} already stored"
+                       + (f", {skipped} without a date or balance skipped" if skipped else ""))
+
+        stored = {name: (count, first, last) for name, count, first, last in accounts(bank)}
+        if carried and stored:
+            account = st.selectbox("Stored account", list(stored), key=f"{key}-store-pick",
+                                   format_func=lambda name: name or "(no account number)")
+        if account not in stored:
+            st.caption("Nothing stored for this account yet.")
+            return
+        count, first, last = stored[account]
+        first, last = datetime.date.fromisoformat(first), datetime.date.fromisoformat(last)
+        picked = st.date_input("Date range", (first, last), min_value=first, max_value=last,
+                               key=f"{key}-store-range")
+        start, end = picked if len(picked) == 2 else (picked[0], picked[0])
+        history = query(bank, account, start, end)
+        st.caption(f"{len(history)} of {count} stored transaction(s) from {first} to {last}")
+        export.download_button("Download stored history", history, f"{file_stem}_history", key=f"{key}-store-download")
@@ -0,0 +1,96 @@
+# streaming.py – Page-by-page parsing with progressive rendering in run()
+#
+# Every bank module exposes iter_pages(file, filename), a generator yielding
+# (page_no, page_count, rows) as each page is parsed, with rows as tuples in
+# the module's `columns` order, and to_frame(buffer, filename), which turns a
+# TransactionBuffer into that bank's per-file DataFrame. Parsers keep only the
+# current page and any multi-line transaction still in flight. Every parse
+# ends with the bank's running-balance check (see reconcile.py), which is
+# cached with the frame.
+
+import importlib
+import time
+
+import numpy as np
+import streamlit as st
+
+import parse_cache
+import reconcile
+import spool
+import timing
+from transaction_buffer import TransactionBuffer
+
+PREVIEW_ROWS = 20
+PREVIEW_INTERVAL = 0.5  # seconds between preview table refreshes
+
+
+def collect(pages, columns):
+    buffer = TransactionBuffer(columns)
+    for _, _, page_rows in timing.timed_pages(pages):
+        buffer.extend(page_rows)
+    return buffer
+
+
+def parse(file, bank, namespace=None, on_page=None, filename=None, **options):
+    """Parse one upload through bank's iter_pages; returns (frame, reconcile.Reconciliation or None).
+
+    bank is the module name (callers pass __name__). Results go through
+    parse_cache, so reruns over the same file skip straight to the finished frame.
+    The parse is timed per page and per stage (see timing.py); uploads above
+    spool.SPOOL_MIN_BYTES are parsed from a temp file (see spool.py).
+    on_page(page_no, page_count, rows), if given, is called after every page
+    with the TransactionBuffer so far; an exception it raises aborts the parse.
+    filename defaults to file.name.
+    """
+    module = importlib.import_module(bank)
+    filename = filename or file.name
+
+    def parse_pages(f):
+        recorder.cached = False
+        rows = TransactionBuffer(module.columns)
+        page_rows_count = []
+
+        # Large uploads are parsed from a temp file rather than more copies in memory
+        with spool.spooled(f) as source:
+            for page_no, page_count, page_rows in timing.timed_pages(module.iter_pages(source, filename, **options)):
+                rows.extend(page_rows)
+                page_rows_count.append(len(page_rows))
+                if on_page is not None:
+                    on_page(page_no, page_count, rows)
+
+        with timing.span("to_frame"):
+            df = module.to_frame(rows, filename)
+
+        with timing.span("reconcile"):
+            # to_frame keeps the buffer's row positions as the index, dropped rows aside
+            row_pages = np.repeat(np.arange(1, len(page_rows_count) + 1), page_rows_count)
+            positions = df.index.to_numpy()
+            pages = row_pages[positions] if positions.dtype.kind == "i" else None
+            return df, reconcile.check(df, getattr(module, "fields", None), pages)
+
+    with timing.file_timer(bank, filename) as recorder:
+        recorder.cached = True
+        version = f"{module.PARSER_VERSION}-r{reconcile.VERSION}"
+        return parse_cache.cached_parse(file, namespace or bank, version, parse_pages)
+
+
+def parse_with_progress(file, bank, namespace=None, **options):
+    """Parse one upload on the script thread, showing progress and the latest rows; see parse()."""
+    module = importlib.import_module(bank)
+    bar = st.progress(0.0, text=f"📄 {file.name}")
+    preview = st.empty()
+    last_preview = 0.0
+
+    def on_page(page_no, page_count, rows):
+        nonlocal last_preview
+        bar.progress(page_no / page_count, text=f"📄 {file.name}: page {page_no}/{page_count} · {len(rows)} rows")
+        if rows and time.monotonic() - last_preview >= PREVIEW_INTERVAL:
+            with timing.span("preview"):
+                preview.dataframe(module.to_frame(rows.tail(PREVIEW_ROWS), file.name))
+            last_preview = time.monotonic()
+
+    try:
+        return parse(file, bank, namespace, on_page, **options)
+    finally:
+        bar.empty()
+        preview.empty()
@@ -0,0 +1,142 @@
+# tests/test_jobs.py – jobs.WorkerPool scheduling with stand-in jobs
+#
+# Usage (from the repository root):
+#   python -m pytest tests
+#
+# FakeJob has the attributes and methods WorkerPool uses (memory, seen, run,
+# _skip); its run() blocks until the test releases it, so what is running at
+# any moment is under the test's control and nothing depends on timing.
+
+import os
+import sys
+import threading
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import jobs
+
+TIMEOUT = 5.0
+
+
+class FakeJob:
+    def __init__(self, name, log, memory_mb=1):
+        self.name = name
+        self.memory = memory_mb * jobs.MB
+        self.seen = time.monotonic()
+        self.status = jobs.QUEUED
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self._pool = None
+        self._log = log
+
+    def run(self):
+        self.status = jobs.RUNNING
+        self._log.append(self.name)
+        self.started.set()
+        self.release.wait(TIMEOUT)
+        self.status = jobs.DONE
+
+    def _skip(self):
+        self.status = jobs.CANCELLED
+
+
+def wait_for(condition):
+    deadline = time.monotonic() + TIMEOUT
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.01)
+
+
+def test_sessions_take_turns_and_report_their_place_in_line():
+    log = []
+    pool = jobs.WorkerPool(workers=1, memory_mb=1024)
+    blocker = FakeJob("X", log)
+    pool.submit("x", blocker)
+    assert blocker.started.wait(TIMEOUT)
+
+    batch = [FakeJob(f"A{i}", log) for i in range(3)]
+    single = [FakeJob(f"B{i}", log) for i in range(2)]
+    for job in batch:
+        pool.submit("a", job)
+    for job in single:
+        pool.submit("b", job)
+
+    assert [pool.position(job) for job in batch] == [(1, 5), (3, 5), (5, 5)]
+    assert [pool.position(job) for job in single] == [(2, 5), (4, 5)]
+
+    for job in [blocker] + batch + single:
+        job.release.set()
+    wait_for(lambda: all(job.status == jobs.DONE for job in batch + single))
+    assert log == ["X", "A0", "B0", "A1", "B1", "A2"]
+    assert pool.position(batch[2]) is None
+
+
+def test_withdrawn_job_never_runs():
+    log = []
+    pool = jobs.WorkerPool(workers=1, memory_mb=1024)
+    blocker, queued, after = FakeJob("X", log), FakeJob("Q", log), FakeJob("Y", log)
+    pool.submit("s", blocker)
+    assert blocker.started.wait(TIMEOUT)
+    pool.submit("s", queued)
+    pool.submit("s", after)
+
+    pool.withdraw(queued)
+    assert queued.status == jobs.CANCELLED
+    assert pool.position(after) == (1, 1)
+
+    blocker.release.set()
+    after.release.set()
+    wait_for(lambda: after.status == jobs.DONE)
+    assert log == ["X", "Y"]
+
+
+def test_job_waits_for_its_memory_and_is_not_passed_over():
+    log = []
+    pool = jobs.WorkerPool(workers=2, memory_mb=100)
+    small, big, later = FakeJob("small", log, 40), FakeJob("big", log, 90), FakeJob("later", log, 40)
+    pool.submit("s1", small)
+    assert small.started.wait(TIMEOUT)
+    pool.submit("s2", big)
+    pool.submit("s3", later)
+
+    # A worker is free, but big does not fit beside small, and later may not go first
+    assert not big.started.wait(0.3)
+    assert not later.started.is_set()
+
+    small.release.set()
+    assert big.started.wait(TIMEOUT)
+    assert not later.started.wait(0.3)  # 90 + 40 MB is over the budget
+    assert pool.reserved == 90 * jobs.MB
+
+    big.release.set()
+    assert later.started.wait(TIMEOUT)
+    later.release.set()
+    wait_for(lambda: pool.running == 0)
+    assert pool.reserved == 0
+
+
+def test_job_larger_than_the_budget_runs_alone():
+    log = []
+    pool = jobs.WorkerPool(workers=2, memory_mb=100)
+    huge = FakeJob("huge", log, 500)
+    pool.submit("s", huge)
+    assert huge.started.wait(TIMEOUT)
+    assert pool.reserved == 100 * jobs.MB
+    huge.release.set()
+    wait_for(lambda: pool.running == 0)
+
+
+def test_abandoned_queued_job_is_dropped():
+    log = []
+    pool = jobs.WorkerPool(workers=1, memory_mb=1024)
+    blocker, abandoned = FakeJob("X", log), FakeJob("gone", log)
+    pool.submit("s", blocker)
+    assert blocker.started.wait(TIMEOUT)
+    abandoned.seen -= jobs.ABANDON_SECONDS + 1  # its page stopped polling long ago
+    pool.submit("t", abandoned)
+
+    blocker.release.set()
+    wait_for(lambda: abandoned.status == jobs.CANCELLED)
+    assert log == ["X"]
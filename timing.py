@@ -0,0 +1,221 @@
+# timing.py – Per-file, per-page and per-stage timings for the bank parsers
+#
+# Bank modules mark their expensive steps with `with timing.span("extract_table"):`
+# (or the @timing.timed(...) decorator). Spans add to whichever recorder is
+# current: streaming.parse opens one per uploaded file, and a run() wrapped in
+# @timing.timed_run opens one for the batch-level steps (combine, rendering).
+# Background parse jobs collect their files' timings and hand them to the
+# run() that picks up the result. With no recorder active, as in headless
+# use, a span only costs a context-variable lookup.
+#
+# page_pool's worker processes record their own spans and hand them back, so a
+# stage such as extract_table is summed over workers and can exceed wall time.
+# timing.count("pages_skipped") adds to a per-file counter the same way.
+#
+# Every finished file emits one JSON line on the "bank_converter.timing"
+# logger, and timed_run shows a collapsible breakdown under the results.
+# BANK_TIMING_LOG=0 turns the log lines off.
+
+import contextvars
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger("bank_converter.timing")
+if os.environ.get("BANK_TIMING_LOG", "1") != "0" and not logger.handlers:
+    _handler = logging.StreamHandler()
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_current = contextvars.ContextVar("timing_recorder", default=None)
+_run = contextvars.ContextVar("timing_run", default=None)
+
+
+class Timings:
+    """Stage totals and page durations (seconds) for one file, or one run()."""
+
+    __slots__ = ("bank", "filename", "stages", "counts", "pages", "total", "cached")
+
+    def __init__(self, bank, filename=None):
+        self.bank = bank
+        self.filename = filename
+        self.stages = {}
+        self.counts = {}
+        self.pages = []
+        self.total = 0.0
+        self.cached = False
+
+    def add(self, stage, seconds):
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+
+    def increment(self, name, n=1):
+        self.counts[name] = self.counts.get(name, 0) + n
+
+    def merge(self, stages):
+        for stage, seconds in stages.items():
+            self.add(stage, seconds)
+
+    def as_record(self):
+        return {
+            "event": "parse_timing",
+            "bank": self.bank,
+            "file": self.filename,
+            "cached": self.cached,
+            "total_ms": round(self.total * 1000, 1),
+            "pages": len(self.pages),
+            "page_ms": [round(seconds * 1000, 1) for seconds in self.pages],
+            "stages_ms": {stage: round(seconds * 1000, 1) for stage, seconds in self.stages.items()},
+            "counts": dict(self.counts),
+        }
+
+
+class RunTimings(Timings):
+    """Timings of one run(): its own batch-level stages plus every file parsed in it."""
+
+    __slots__ = ("files",)
+
+    def __init__(self, bank):
+        super().__init__(bank)
+        self.files = []
+
+
+# ==== Recording ====
+def current():
+    """Return the active recorder, or None outside a timed file/run."""
+    return _current.get()
+
+
+@contextmanager
+def span(stage):
+    recorder = _current.get()
+    if recorder is None:
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.add(stage, time.perf_counter() - started)
+
+
+def count(name, n=1):
+    """Add n to the active recorder's counter `name` (no-op outside a timed file/run)."""
+    recorder = _current.get()
+    if recorder is not None:
+        recorder.increment(name, n)
+
+
+def timed(stage):
+    """Decorator form of span()."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+def timed_pages(pages):
+    """Pass (page_no, page_count, rows) items through, recording each page's wall time."""
+    recorder = _current.get()
+    started = time.perf_counter()
+    for item in pages:
+        if recorder is not None:
+            recorder.pages.append(time.perf_counter() - started)
+        yield item
+        started = time.perf_counter()
+
+
+@contextmanager
+def recording(recorder):
+    """Make recorder current (used by page_pool's workers)."""
+    token = _current.set(recorder)
+    try:
+        yield recorder
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def file_timer(bank, filename):
+    """Time one file's parse; logs it as JSON and adds it to the enclosing run()."""
+    recorder = Timings(bank, filename)
+    started = time.perf_counter()
+    try:
+        with recording(recorder):
+            yield recorder
+    finally:
+        recorder.total = time.perf_counter() - started
+        logger.info(json.dumps(recorder.as_record(), ensure_ascii=False))
+        run = _run.get()
+        if run is not None:
+            run.files.append(recorder)
+
+
+@contextmanager
+def collecting(run):
+    """Make run the enclosing run() for file timers outside one (background parse jobs)."""
+    token = _run.set(run)
+    try:
+        yield run
+    finally:
+        _run.reset(token)
+
+
+def attach(files):
+    """Add file timings recorded by collecting() to the enclosing run(), if any."""
+    run = _run.get()
+    if run is not None:
+        run.files.extend(files)
+
+
+def timed_run(run_fn):
+    """Wrap a bank module's run() to time it and show the breakdown under its results."""
+    @functools.wraps(run_fn)
+    def wrapper(*args, **kwargs):
+        recorder = RunTimings(run_fn.__module__)
+        token = _run.set(recorder)
+        started = time.perf_counter()
+        try:
+            with recording(recorder):
+                result = run_fn(*args, **kwargs)
+        finally:
+            _run.reset(token)
+        recorder.total = time.perf_counter() - started
+        if recorder.files:
+            show(recorder)
+        return result
+    return wrapper
+
+
+# ==== Streamlit UI ====
+def breakdown(run):
+    """One row per file plus a batch row; stage columns in milliseconds."""
+    rows = []
+    for timings in run.files + [run]:
+        row = {
+            "File": timings.filename if timings is not run else "(whole run)",
+            "Cached": timings.cached if timings is not run else None,
+            "Pages": len(timings.pages) if timings is not run else None,
+            "Total (ms)": round(timings.total * 1000, 1),
+            "Slowest page (ms)": round(max(timings.pages) * 1000, 1) if timings.pages else None,
+        }
+        for stage, seconds in timings.stages.items():
+            row[f"{stage} (ms)"] = round(seconds * 1000, 1)
+        row.update(timings.counts)
+        rows.append(row)
+    return rows
+
+
+def show(run):
+    import pandas as pd
+    import streamlit as st
+
+    with st.expander(f"⏱️ Timing breakdown ({run.total:.2f}s)"):
+        st.dataframe(pd.DataFrame(breakdown(run)))
@@ -0,0 +1,60 @@
+# transaction_buffer.py – Shared columnar accumulator for parsed transactions
+#
+# Parsers append each finished transaction as a row (a tuple/list in column
+# order) and the buffer files its values straight into one list per column.
+# No per-row dicts are kept, and the DataFrame is built once, column-wise, at
+# the end. PendingTransaction is the small __slots__ record parsers use for
+# the multi-line transaction still being read.
+
+import pandas as pd
+
+
+class PendingTransaction:
+    """A transaction whose continuation lines are still being collected."""
+
+    __slots__ = ("date", "value_date", "lines")
+
+    def __init__(self, date="", value_date="", lines=None):
+        self.date = date
+        self.value_date = value_date
+        self.lines = lines if lines is not None else []
+
+    def add(self, line):
+        self.lines.append(line)
+
+    def __bool__(self):
+        return bool(self.lines)
+
+
+class TransactionBuffer:
+    """Column-oriented accumulator that materializes one DataFrame."""
+
+    __slots__ = ("columns", "_data")
+
+    def __init__(self, columns):
+        self.columns = list(columns)
+        self._data = [[] for _ in self.columns]
+
+    def append(self, row):
+        for values, value in zip(self._data, row):
+            values.append(value)
+
+    def extend(self, rows):
+        # Transpose a page of rows in one pass, then extend each column list
+        for values, column in zip(self._data, zip(*rows)):
+            values.extend(column)
+
+    def __len__(self):
+        return len(self._data[0]) if self._data else 0
+
+    def tail(self, n):
+        """Return a new buffer holding the last n rows (for previews)."""
+        tail = TransactionBuffer(self.columns)
+        tail._data = [values[-n:] for values in self._data]
+        return tail
+
+    def to_frame(self):
+        if not len(self):
+            # Same empty frame as pd.DataFrame([], columns=...): object columns
+            return pd.DataFrame(columns=self.columns)
+        return pd.DataFrame(dict(zip(self.columns, self._data)), columns=self.columns)